@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List, Optional
 import os
 
 class Settings(BaseSettings):
@@ -16,12 +16,46 @@ class Settings(BaseSettings):
     # API Configuration
     GROQ_API_KEY: str = os.getenv("GROQ_API_KEY", "")
     GROQ_MODEL: str = "llama-3.1-8b-instant"
-    MAX_TOKENS: int = 4000
+    GROQ_BASE_URL: Optional[str] = None
+    MAX_TOKENS: int = 8192
+    PROMPT_MAX_TOKENS: int = 4000
+    COMPLETION_TOKENS_PER_QUESTION: int = 200
+    COMPLETION_TOKEN_HEADROOM: float = 1.25
+    COMPLETION_TOKEN_STDDEVS: float = 2.0
+    TOKEN_CALIBRATION_ALPHA: float = 0.1
     TEMPERATURE: float = 0.7
-    
+    GROQ_REQUESTS_PER_MINUTE: int = 30
+
+    # Cache Configuration
+    CACHE_ENABLED: bool = True
+    CACHE_TTL_SECONDS: int = 24 * 60 * 60
+    CACHE_MAX_ENTRIES: int = 1000
+
+    # Cache Warmer Configuration
+    WARMER_ENABLED: bool = False
+    WARMER_INTERVAL_SECONDS: int = 60
+    WARMER_TOKENS_PER_HOUR: int = 50000
+    WARMER_MIN_HITS: int = 3
+    WARMER_REFRESH_BEFORE_EXPIRY_SECONDS: int = 30 * 60
+    WARMER_OFF_PEAK_HOURS: List[int] = [0, 1, 2, 3, 4, 5]
+    WARMER_RATE_LIMIT_SHARE: float = 0.5
+
+    # Tenant Configuration
+    TENANT_API_KEYS: Dict[str, str] = {}  # API key -> tenant name
+    TENANT_REQUIRE_API_KEY: bool = False
+    TENANT_WEIGHTS: Dict[str, float] = {}
+    TENANT_DEFAULT_PRIORITY: str = "interactive"  # used when X-Priority is absent
+    TENANT_PRIORITIES: Dict[str, Dict[str, str]] = {}  # tenant -> {"default": ..., "max": ...}
+    TENANT_QUOTAS: Dict[str, Dict[str, float]] = {}  # per-tenant overrides of the defaults below
+    TENANT_REQUESTS_PER_MINUTE: float = 0  # 0 disables the quota
+    TENANT_REQUEST_BURST: float = 10
+    TENANT_TOKENS_PER_MINUTE: float = 0  # 0 disables the quota
+    TENANT_TOKEN_BURST: float = 30000
+    SCHEDULER_MAX_CONCURRENCY: int = 8
+
     # File Configuration
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
-    MAX_PDF_CHARS: int = 8000
+    MAX_PDF_CHARS: int = 40000
     ALLOWED_FILE_TYPES: List[str] = [".pdf"]
     
     # MCQ Configuration
@@ -31,12 +65,42 @@ class Settings(BaseSettings):
     DIFFICULTY_LEVELS: List[str] = ["easy", "medium", "hard"]
     QUESTION_TYPES: List[str] = ["general", "analytical", "factual"]
     
+    # Duplicate Detection Configuration
+    DEDUP_MODE: str = "flag"  # drop, flag or off
+    DEDUP_THRESHOLD: float = 0.6  # question text similarity
+    DEDUP_OPTIONS_THRESHOLD: float = 0.6  # option set similarity
+    DEDUP_NUM_PERM: int = 128
+    DEDUP_BANDS: int = 32
+    DEDUP_SHINGLE_SIZE: int = 4
+    DEDUP_HISTORY_SIZE: int = 2000  # Per topic or PDF
+    DEDUP_MAX_SCOPES: int = 500
+    DEDUP_MAX_SIGNATURES: int = 25000  # Across scopes, about 4 KB each (~100 MB)
+    
+    # Result Storage Configuration
+    RESULT_STORE_MAX_ENTRIES: int = 1000
+    COMPRESSION_MIN_SIZE: int = 1024
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 5
+    
     # CORS Configuration
     ALLOWED_ORIGINS: List[str] = ["*"]
     
     # Logging Configuration
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    LOG_JSON: bool = True
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_PAYLOAD_SAMPLE_RATE: float = 0.0
+    
+    # Admin Configuration
+    ADMIN_TOKEN: str = ""
+    
+    # Profiling Configuration
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_INTERVAL_MS: float = 5.0
+    PROFILING_MAX_REPORTS: int = 20
+    PROFILING_TRACEMALLOC_TOP: int = 25
+    SLOW_REQUESTS_WINDOW: int = 1000
     
     class Config:
         env_file = ".env"
@@ -1,9 +1,14 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.routers import mcq_router, health_router
+from app.routers import mcq_router, health_router, admin_router, results_router
+from app.services.profiling_service import profiling_service
+from app.services.warmer_service import cache_warmer
 from app.utils.logging_config import setup_logging
+from app.utils.request_context import request_id_var, stage_timings_var
 import logging
+import time
+import uuid
 
 # Setup logging
 setup_logging()
@@ -24,17 +29,61 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def request_context_middleware(request: Request, call_next):
+    """Assign a request id and log a structured summary with stage timings"""
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    timings = {}
+    id_token = request_id_var.set(request_id)
+    timings_token = stage_timings_var.set(timings)
+    profile = None
+    if settings.PROFILING_ENABLED and profiling_service.is_requested(request.headers, request.query_params):
+        profile = profiling_service.start(request_id)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+        duration_ms = round((time.perf_counter() - start) * 1000, 3)
+        response.headers["X-Request-ID"] = request_id
+        if settings.PROFILING_ENABLED:
+            if profile is not None:
+                profiling_service.finish(profile, duration_ms, timings)
+                profile = None
+                response.headers["X-Profile-ID"] = request_id
+            profiling_service.record_request(
+                request_id, request.method, request.url.path, response.status_code, duration_ms, timings
+            )
+        logger.info(
+            "Request completed",
+            extra={
+                "method": request.method,
+                "path": request.url.path,
+                "status_code": response.status_code,
+                "duration_ms": duration_ms,
+                "stages": timings
+            }
+        )
+        return response
+    finally:
+        if profile is not None:
+            profiling_service.finish(profile, round((time.perf_counter() - start) * 1000, 3), timings)
+        request_id_var.reset(id_token)
+        stage_timings_var.reset(timings_token)
+
 # Include routers
 app.include_router(mcq_router.router, prefix="/api/v1")
+app.include_router(results_router.router, prefix="/api/v1")
 app.include_router(health_router.router)
+app.include_router(admin_router.router)
 
 @app.on_event("startup")
 async def startup_event():
     logger.info(f"Starting {settings.APP_NAME} version {settings.APP_VERSION}")
+    cache_warmer.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down application")
+    await cache_warmer.stop()
 
 @app.get("/")
 async def root():
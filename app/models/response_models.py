@@ -11,6 +11,7 @@ class MCQuestion(BaseModel):
     explanation: str
 
 class MCQResponse(BaseModel):
+    id: Optional[str] = None
     questions: List[MCQuestion]
     generated_at: str
     source_type: str
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Header, HTTPException, Query
+from app.services.profiling_service import profiling_service
+from app.services.scheduler_service import tenant_scheduler
+from app.utils.security import is_admin_token
+from app.config import settings
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+def require_admin(token: Optional[str]) -> None:
+    """Reject the call unless the admin token matches"""
+    if not is_admin_token(token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+def require_profiling(token: Optional[str]) -> None:
+    """Hide profiling endpoints unless profiling is enabled"""
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    require_admin(token)
+
+@router.get("/profiles")
+async def list_profiles(x_admin_token: Optional[str] = Header(None)):
+    """List stored per-request profiles, newest first"""
+    require_profiling(x_admin_token)
+    return {"profiles": profiling_service.list_reports()}
+
+@router.get("/profiles/{request_id}")
+async def get_profile(request_id: str, x_admin_token: Optional[str] = Header(None)):
+    """Get the CPU and memory profile captured for a request"""
+    require_profiling(x_admin_token)
+    report = profiling_service.get_report(request_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail=f"No profile for request {request_id}")
+    return report
+
+@router.get("/slow-requests")
+async def slow_requests(
+    limit: int = Query(10, ge=1, le=100),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """Slowest recent requests with their stage breakdowns"""
+    require_profiling(x_admin_token)
+    return {"requests": profiling_service.slowest_requests(limit)}
+
+@router.get("/tenants")
+async def tenant_usage(x_admin_token: Optional[str] = Header(None)):
+    """Per-tenant usage counters and remaining quota"""
+    require_admin(x_admin_token)
+    return {"tenants": tenant_scheduler.usage_report()}
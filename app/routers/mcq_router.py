@@ -1,28 +1,74 @@
-from fastapi import APIRouter, File, UploadFile, HTTPException, Form, Depends
+from fastapi import APIRouter, File, UploadFile, HTTPException, Form, Depends, Request, Header
 from app.models.request_models import TopicRequest, PDFRequest
 from app.models.response_models import MCQResponse, ErrorResponse
 from app.services.mcq_service import mcq_service
 from app.services.pdf_service import pdf_service
-from app.utils.exceptions import PDFProcessingError, GroqAPIError
+from app.services.result_store import result_store
+from app.services.scheduler_service import tenant_scheduler
+from app.utils.exceptions import PDFProcessingError, GroqAPIError, QuotaExceededError
+from app.utils.http_cache import stored_result_response
+from app.utils.logging_config import log_payload
+from app.utils.request_context import track_stage
+from typing import Optional
+import math
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/generate", tags=["MCQ Generation"])
 
+def get_tenant(x_api_key: Optional[str] = Header(None)) -> str:
+    """Identify the tenant from the X-API-Key header"""
+    tenant = tenant_scheduler.resolve_tenant(x_api_key)
+    if tenant is None:
+        raise HTTPException(status_code=401, detail="Valid X-API-Key header required")
+    return tenant
+
+def get_priority(tenant: str = Depends(get_tenant), x_priority: Optional[str] = Header(None)) -> str:
+    """Scheduling class from the X-Priority header, limited by the tenant's priority settings"""
+    return tenant_scheduler.resolve_priority(tenant, x_priority)
+
+def get_use_cache(cache_control: Optional[str] = Header(None)) -> bool:
+    """`Cache-Control: no-cache` asks for a freshly generated set"""
+    directives = {d.strip().lower() for d in (cache_control or "").split(",")}
+    return not directives & {"no-cache", "no-store"}
+
+def quota_exceeded(e: QuotaExceededError) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=str(e),
+        headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+    )
+
+def quiz_response(response: MCQResponse, http_request: Request, tenant: str):
+    """Store and serve a quiz set with its id and ETag"""
+    return stored_result_response(result_store.put(response, tenant), http_request)
+
 @router.post("/topic", response_model=MCQResponse)
-async def generate_mcqs_from_topic(request: TopicRequest):
+async def generate_mcqs_from_topic(
+    request: TopicRequest,
+    http_request: Request,
+    tenant: str = Depends(get_tenant),
+    priority: str = Depends(get_priority),
+    use_cache: bool = Depends(get_use_cache)
+):
     """Generate MCQs from a given topic"""
     try:
         response = await mcq_service.generate_mcqs_from_topic(
             topic=request.topic,
             num_questions=request.num_questions,
             difficulty=request.difficulty,
-            question_type=request.question_type
+            question_type=request.question_type,
+            tenant=tenant,
+            priority=priority,
+            use_cache=use_cache
         )
-        logger.info(response)
-        return response
+        log_payload(logger, "Generated MCQs from topic", response)
+        return quiz_response(response, http_request, tenant)
         
+    except QuotaExceededError as e:
+        logger.warning(f"Quota exceeded: {str(e)}")
+        raise quota_exceeded(e)
     except GroqAPIError as e:
         logger.error(f"Groq API error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -32,8 +78,12 @@ async def generate_mcqs_from_topic(request: TopicRequest):
 
 @router.post("/pdf", response_model=MCQResponse)
 async def generate_mcqs_from_pdf(
+    http_request: Request,
     file: UploadFile = File(...),
-    request: PDFRequest = Depends()  # Use PDFRequest model
+    request: PDFRequest = Depends(),  # Use PDFRequest model
+    tenant: str = Depends(get_tenant),
+    priority: str = Depends(get_priority),
+    use_cache: bool = Depends(get_use_cache)
 ):
     """Generate MCQs from uploaded PDF file"""
     try:
@@ -41,23 +91,31 @@ async def generate_mcqs_from_pdf(
         pdf_service.validate_pdf_file(file.filename, file.size or 0)
         
         # Read and extract text from PDF
-        file_content = await file.read()
-        text_content = pdf_service.extract_text_from_pdf(file_content)
+        with track_stage("pdf_read"):
+            file_content = await file.read()
+        with track_stage("pdf_extract"):
+            text_content = pdf_service.extract_text_from_pdf(file_content)
         
         # Generate MCQs
         response = await mcq_service.generate_mcqs_from_pdf(
             pdf_content=text_content,
             num_questions=request.num_questions,
             difficulty=request.difficulty,
-            question_type=request.question_type
+            question_type=request.question_type,
+            tenant=tenant,
+            priority=priority,
+            use_cache=use_cache
         )
-        logger.info(request.num_questions,"//",request.difficulty)
+        log_payload(logger, "Generated MCQs from PDF", response)
         
-        return response
+        return quiz_response(response, http_request, tenant)
         
     except PDFProcessingError as e:
         logger.error(f"PDF processing error: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
+    except QuotaExceededError as e:
+        logger.warning(f"Quota exceeded: {str(e)}")
+        raise quota_exceeded(e)
     except GroqAPIError as e:
         logger.error(f"Groq API error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from app.models.response_models import MCQResponse
+from app.routers.mcq_router import get_tenant
+from app.services.result_store import result_store
+from app.utils.http_cache import stored_result_response
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/results", tags=["Results"])
+
+@router.get("/{result_id}", response_model=MCQResponse, responses={304: {"description": "Not Modified"}})
+async def get_result(result_id: str, request: Request, tenant: str = Depends(get_tenant)):
+    """Fetch a previously generated quiz set by id (supports If-None-Match)
+
+    Only the tenants the set was generated or served for can fetch it.
+    """
+    stored = result_store.get(result_id, tenant)
+    if stored is None:
+        raise HTTPException(status_code=404, detail=f"Result {result_id} not found")
+    return stored_result_response(stored, request)
@@ -0,0 +1,103 @@
+from app.config import settings
+from app.models.response_models import MCQResponse
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CacheEntry:
+    response: MCQResponse
+    expires_at: float
+    tokens: int = 0
+
+@dataclass
+class KeyStats:
+    params: dict
+    hits: int = 0
+    last_seen: float = 0.0
+
+class CacheService:
+    """In-memory TTL cache for generated MCQ sets with request popularity tracking"""
+
+    def __init__(self):
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._stats: Dict[str, KeyStats] = {}
+
+    @staticmethod
+    def make_key(source_type: str, content: str, num_questions: int, difficulty: str, question_type: str) -> str:
+        """Build a normalized generation key"""
+        if source_type == "pdf":
+            normalized = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        else:
+            normalized = " ".join(content.lower().split())
+        return f"{source_type}:{num_questions}:{difficulty}:{question_type}:{normalized}"
+
+    def get(self, key: str) -> Optional[MCQResponse]:
+        """Return a cached response, or None if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry.response
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        """Return the raw cache entry without touching recency"""
+        return self._entries.get(key)
+
+    def set(self, key: str, response: MCQResponse, tokens: int = 0) -> None:
+        """Store a response, evicting the least recently used entry when full"""
+        self._entries[key] = CacheEntry(
+            response=response,
+            expires_at=time.monotonic() + settings.CACHE_TTL_SECONDS,
+            tokens=tokens
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > settings.CACHE_MAX_ENTRIES:
+            evicted, _ = self._entries.popitem(last=False)
+            logger.debug(f"Evicted cache entry {evicted}")
+
+    def ttl_remaining(self, key: str) -> Optional[float]:
+        """Seconds until the entry expires, or None if it is not cached"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return entry.expires_at - time.monotonic()
+
+    def record_request(self, key: str, params: dict) -> None:
+        """Count a request for `key`, keeping the params needed to regenerate it"""
+        stats = self._stats.get(key)
+        if stats is None:
+            if len(self._stats) >= settings.CACHE_MAX_ENTRIES * 4:
+                coldest = min(self._stats, key=lambda k: self._stats[k].hits)
+                del self._stats[coldest]
+            stats = self._stats[key] = KeyStats(params=params)
+        stats.hits += 1
+        stats.last_seen = time.monotonic()
+
+    def popular_keys(self, min_hits: int) -> List[Tuple[str, KeyStats]]:
+        """Keys with at least `min_hits` requests, most popular first"""
+        popular = [(k, s) for k, s in self._stats.items() if s.hits >= min_hits]
+        popular.sort(key=lambda item: item[1].hits, reverse=True)
+        return popular
+
+    def decay_popularity(self) -> None:
+        """Halve all hit counts so popularity follows recent traffic"""
+        for key in list(self._stats):
+            self._stats[key].hits //= 2
+            if self._stats[key].hits == 0:
+                del self._stats[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._stats.clear()
+
+# Global instance
+cache_service = CacheService()
@@ -0,0 +1,232 @@
+from app.config import settings
+from app.models.response_models import MCQuestion
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+import logging
+import re
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_OPTION_PREFIX_RE = re.compile(r"^\s*[a-d][\).:]\s*", re.IGNORECASE)
+_NON_WORD_RE = re.compile(r"[^a-z0-9 ]+")
+
+def _normalize(text: str) -> str:
+    return " ".join(_NON_WORD_RE.sub(" ", text.lower()).split())
+
+def question_text(question: MCQuestion) -> str:
+    """Normalized question text"""
+    return _normalize(question.question)
+
+def options_text(question: MCQuestion) -> str:
+    """Normalized options without their labels, in a stable order"""
+    return " ".join(sorted(_normalize(_OPTION_PREFIX_RE.sub("", opt.option)) for opt in question.options))
+
+class MinHasher:
+    """MinHash signatures over hashed byte shingles, vectorized with NumPy
+
+    Permutations use multiply-shift hashing, (a * h + b) mod 2**64 >> 32,
+    which relies on uint64 wraparound instead of a slower modulo.
+    """
+
+    def __init__(self, num_perm: int, shingle_size: int, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.shingle_size = shingle_size
+        self.a = rng.integers(0, 2 ** 63, size=(num_perm, 1), dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.integers(0, 2 ** 63, size=(num_perm, 1), dtype=np.uint64)
+        self._weights = [np.uint64(pow(257, k, 2 ** 64)) for k in reversed(range(shingle_size))]
+
+    def shingles(self, text: str) -> np.ndarray:
+        """Polynomial hashes of every `shingle_size`-byte window"""
+        n = self.shingle_size
+        data = np.frombuffer(text.encode("utf-8"), dtype=np.uint8).astype(np.uint64)
+        if len(data) < n:
+            data = np.pad(data, (0, n - len(data)))
+        count = len(data) - n + 1
+        hashes = data[:count] * self._weights[0]
+        for offset in range(1, n):
+            hashes += data[offset:offset + count] * self._weights[offset]
+        return hashes
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = self.shingles(text)
+        return ((self.a * hashes + self.b) >> np.uint64(32)).min(axis=1).astype(np.uint32)
+
+def is_similar(signatures: np.ndarray, signature: np.ndarray) -> np.ndarray:
+    """Which rows of `signatures` match `signature` on both question and options
+
+    Each signature holds the question's MinHash followed by the options'.
+    """
+    half = signature.shape[0] // 2
+    equal = signatures == signature
+    return (
+        (equal[:, :half].mean(axis=1) >= settings.DEDUP_THRESHOLD)
+        & (equal[:, half:].mean(axis=1) >= settings.DEDUP_OPTIONS_THRESHOLD)
+    )
+
+class DuplicateIndex:
+    """LSH index of question/options MinHash signatures for one topic or document
+
+    The question half of each signature is split into `bands` bands; every
+    band is reduced to one salted 64-bit key, so a single dict lookup per
+    band finds candidates, which are then checked on both halves.
+    """
+
+    def __init__(self, bands: int, num_perm: int):
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._salts = np.random.default_rng(bands).integers(1, 2 ** 63, size=(bands, self.rows), dtype=np.uint64)
+        self._matrix = np.empty((64, 2 * num_perm), dtype=np.uint32)
+        self._size = 0
+        self._table: Dict[int, List[int]] = {}
+
+    @property
+    def signatures(self) -> np.ndarray:
+        return self._matrix[:self._size]
+
+    def band_keys(self, signature: np.ndarray) -> List[int]:
+        bands = signature[:self.bands * self.rows].reshape(self.bands, self.rows).astype(np.uint64)
+        return (bands * self._salts).sum(axis=1).tolist()
+
+    def query(self, signature: np.ndarray, keys: List[int] = None) -> bool:
+        """Whether a stored signature is similar to `signature`"""
+        candidates: Set[int] = set()
+        for key in keys if keys is not None else self.band_keys(signature):
+            ids = self._table.get(key)
+            if ids:
+                candidates.update(ids)
+        if not candidates:
+            return False
+        ids = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        return bool(is_similar(self._matrix[ids], signature).any())
+
+    def add(self, signature: np.ndarray, keys: List[int] = None) -> None:
+        if self._size == len(self._matrix):
+            self._matrix = np.concatenate([self._matrix, np.empty_like(self._matrix)])
+        index = self._size
+        self._matrix[index] = signature
+        self._size += 1
+        for key in keys if keys is not None else self.band_keys(signature):
+            self._table.setdefault(key, []).append(index)
+
+    def __len__(self) -> int:
+        return self._size
+
+class DedupService:
+    """Detect near-duplicate questions within a set and against recent history
+
+    Two questions are near-duplicates only if both their question texts
+    (DEDUP_THRESHOLD) and their option sets (DEDUP_OPTIONS_THRESHOLD) are
+    similar, so different questions sharing an option list are kept apart.
+
+    History is kept per scope (topic or PDF) for up to DEDUP_HISTORY_SIZE
+    questions, and least recently used scopes are evicted once all scopes
+    together hold DEDUP_MAX_SIGNATURES questions (about 4 KB each).
+    """
+
+    def __init__(self):
+        self.hasher = MinHasher(settings.DEDUP_NUM_PERM, settings.DEDUP_SHINGLE_SIZE)
+        self._indexes: "OrderedDict[str, DuplicateIndex]" = OrderedDict()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def signature(self, question: MCQuestion) -> np.ndarray:
+        return np.concatenate([
+            self.hasher.signature(question_text(question)),
+            self.hasher.signature(options_text(question))
+        ])
+
+    def _index(self, scope: str) -> DuplicateIndex:
+        index = self._indexes.get(scope)
+        if index is None:
+            index = self._indexes[scope] = DuplicateIndex(settings.DEDUP_BANDS, settings.DEDUP_NUM_PERM)
+        self._indexes.move_to_end(scope)
+        return index
+
+    def _trim(self, scope: str, index: DuplicateIndex) -> DuplicateIndex:
+        """Keep the newest half of the history once it reaches its limit"""
+        if len(index) < min(settings.DEDUP_HISTORY_SIZE, settings.DEDUP_MAX_SIGNATURES):
+            return index
+        trimmed = DuplicateIndex(settings.DEDUP_BANDS, settings.DEDUP_NUM_PERM)
+        for signature in index.signatures[len(index) // 2:]:
+            trimmed.add(signature)
+        self._indexes[scope] = trimmed
+        self._size -= len(index) - len(trimmed)
+        return trimmed
+
+    def _evict(self) -> None:
+        """Drop least recently used scopes until within the scope and signature limits"""
+        while len(self._indexes) > 1 and (
+            len(self._indexes) > settings.DEDUP_MAX_SCOPES or self._size > settings.DEDUP_MAX_SIGNATURES
+        ):
+            _, evicted = self._indexes.popitem(last=False)
+            self._size -= len(evicted)
+
+    def find_duplicates(self, scope: str, questions: List[MCQuestion],
+                        use_history: bool = True) -> Tuple[List[int], List[int]]:
+        """Positions of questions repeating an earlier one in the set, and of those repeating the scope's history
+
+        Questions that are new to the scope are added to its history.
+        """
+        history = self._trim(scope, self._index(scope)) if use_history else None
+        kept: List[np.ndarray] = []
+        new: List[Tuple[np.ndarray, List[int]]] = []
+        in_set, in_history = [], []
+        for position, question in enumerate(questions):
+            signature = self.signature(question)
+            # Sets are small, so compare against the set's own questions directly
+            if kept and is_similar(np.stack(kept), signature).any():
+                in_set.append(position)
+                continue
+            kept.append(signature)
+            if history is not None:
+                keys = history.band_keys(signature)
+                if history.query(signature, keys):
+                    in_history.append(position)
+                else:
+                    new.append((signature, keys))
+        if history is not None:
+            for signature, keys in new:
+                history.add(signature, keys)
+            self._size += len(new)
+            self._evict()
+        return in_set, in_history
+
+    def apply(self, scope: str, questions: List[MCQuestion], use_history: bool = True) -> Tuple[List[MCQuestion], dict]:
+        """Handle near-duplicates according to DEDUP_MODE
+
+        Repeats within the set are dropped (`drop`) or flagged (`flag`).
+        Questions repeating the scope's history are only ever flagged, so
+        asking for the same topic again still returns a full set. Returns
+        the questions to send and metadata describing what was found.
+        """
+        if settings.DEDUP_MODE == "off" or not questions:
+            return questions, {}
+        in_set, in_history = self.find_duplicates(scope, questions, use_history)
+        if not (in_set or in_history):
+            return questions, {}
+        logger.info(f"Found {len(in_set)} repeated and {len(in_history)} previously generated questions")
+        if settings.DEDUP_MODE == "flag":
+            metadata = {"duplicate_questions": in_set} if in_set else {}
+        else:
+            dropped = set(in_set)
+            positions = {}
+            kept = []
+            for position, question in enumerate(questions):
+                if position not in dropped:
+                    positions[position] = len(kept)
+                    kept.append(question)
+            questions, in_history = kept, [positions[position] for position in in_history]
+            metadata = {"duplicates_removed": len(in_set)} if in_set else {}
+        if in_history:
+            metadata["previously_generated"] = in_history
+        return questions, metadata
+
+    def clear(self) -> None:
+        self._indexes.clear()
+        self._size = 0
+
+# Global instance
+dedup_service = DedupService()
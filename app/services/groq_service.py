@@ -1,27 +1,58 @@
-from groq import Groq
+from groq import AsyncGroq
 from app.config import settings
-from app.utils.exceptions import GroqAPIError
+from app.utils.exceptions import CompletionTruncatedError, GroqAPIError
+from collections import deque
 import json
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+SYSTEM_PROMPT = "You are an expert educator and question generator. Always respond with valid JSON format as requested."
+
 class GroqService:
     def __init__(self):
         if not settings.GROQ_API_KEY:
             raise ValueError("GROQ_API_KEY is required")
-        self.client = Groq(api_key=settings.GROQ_API_KEY)
-    
-    async def generate_mcqs(self, prompt: str) -> dict:
-        """Generate MCQs using Groq API"""
+        self.client = AsyncGroq(api_key=settings.GROQ_API_KEY, base_url=settings.GROQ_BASE_URL)
+        self.live_in_flight = 0
+        self._recent_calls = deque()
+
+    def _prune_recent_calls(self, window: float) -> None:
+        cutoff = time.monotonic() - window
+        while self._recent_calls and self._recent_calls[0] < cutoff:
+            self._recent_calls.popleft()
+
+    def recent_request_count(self, window: float = 60.0) -> int:
+        """Number of upstream calls started within the last `window` seconds"""
+        self._prune_recent_calls(window)
+        return len(self._recent_calls)
+
+    def has_capacity(self, share: float = 1.0) -> bool:
+        """Check whether a call fits within `share` of the per-minute rate limit"""
+        return self.recent_request_count() < settings.GROQ_REQUESTS_PER_MINUTE * share
+
+    async def generate_mcqs(self, prompt: str, background: bool = False, max_tokens: int = None) -> dict:
+        """Generate MCQs using Groq API
+
+        Background calls (cache warming) are not counted as live traffic.
+        The returned dict carries the upstream token usage under "usage" and
+        the "finish_reason"; a completion cut off at `max_tokens` raises
+        CompletionTruncatedError.
+        """
+        # Only the last minute is ever counted, so keep the deque to that window
+        self._prune_recent_calls(60.0)
+        self._recent_calls.append(time.monotonic())
+        if not background:
+            self.live_in_flight += 1
         try:
             logger.info("Sending request to Groq API")
-            
-            response = self.client.chat.completions.create(
+
+            response = await self.client.chat.completions.create(
                 messages=[
                     {
                         "role": "system",
-                        "content": "You are an expert educator and question generator. Always respond with valid JSON format as requested."
+                        "content": SYSTEM_PROMPT
                     },
                     {
                         "role": "user",
@@ -30,26 +61,47 @@ class GroqService:
                 ],
                 model=settings.GROQ_MODEL,
                 temperature=settings.TEMPERATURE,
-                max_tokens=settings.MAX_TOKENS,
+                max_tokens=max_tokens or settings.MAX_TOKENS,
                 response_format={"type": "json_object"}
             )
-            
-            content = response.choices[0].message.content
+
+            choice = response.choices[0]
+            usage = getattr(response, "usage", None)
+            usage = {
+                "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+                "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+                "total_tokens": getattr(usage, "total_tokens", 0) or 0,
+            }
+            if choice.finish_reason == "length":
+                logger.warning(f"Groq completion truncated at {max_tokens or settings.MAX_TOKENS} tokens")
+                raise CompletionTruncatedError(
+                    "AI response was cut off at the token limit",
+                    max_tokens=max_tokens or settings.MAX_TOKENS,
+                    usage=usage
+                )
             logger.info("Successfully received response from Groq API")
-            
-            return json.loads(content)
-            
+
+            result = json.loads(choice.message.content)
+            result["usage"] = usage
+            result["finish_reason"] = choice.finish_reason
+            return result
+
+        except GroqAPIError:
+            raise
         except json.JSONDecodeError as e:
             logger.error(f"JSON decode error: {str(e)}")
             raise GroqAPIError("Failed to parse AI response")
         except Exception as e:
             logger.error(f"Groq API error: {str(e)}")
             raise GroqAPIError(f"Failed to generate questions: {str(e)}")
-    
+        finally:
+            if not background:
+                self.live_in_flight -= 1
+
     async def test_connection(self) -> bool:
         """Test connection to Groq API"""
         try:
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 messages=[{"role": "user", "content": "Hello"}],
                 model=settings.GROQ_MODEL,
                 max_tokens=10
@@ -60,4 +112,4 @@ class GroqService:
             return False
 
 # Global instance
-groq_service = GroqService()
\ No newline at end of file
+groq_service = GroqService()
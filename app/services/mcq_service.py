@@ -1,6 +1,14 @@
-from app.services.groq_service import groq_service
+from app.services.groq_service import groq_service, SYSTEM_PROMPT
+from app.services.token_service import token_estimator
+from app.services.scheduler_service import tenant_scheduler, ANONYMOUS_TENANT
+from app.services.cache_service import cache_service
+from app.services.dedup_service import dedup_service
+from app.config import settings
 from app.models.response_models import MCQuestion, MCQOption, MCQResponse
+from app.utils.exceptions import CompletionTruncatedError
+from app.utils.request_context import track_stage
 from datetime import datetime
+import hashlib
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,10 +31,11 @@ class MCQService:
             "factual": "Focus on questions that test specific facts, definitions, and direct information recall."
         }
         
-        prompt = f"""
+        def render(body: str) -> str:
+            return f"""
 You are an expert educator and question generator. Create {num_questions} high-quality multiple choice questions {source_context}.
 
-Content/Topic: {content}
+Content/Topic: {body}
 
 Instructions:
 - Difficulty: {difficulty} - {difficulty_instructions.get(difficulty, '')}
@@ -57,33 +66,126 @@ Return the response in the following JSON format:
 
 IMPORTANT: Return only valid JSON, no additional text or formatting.
 """
-        return prompt
+        
+        # Fit the content into what is left of the prompt token budget
+        available = settings.PROMPT_MAX_TOKENS - token_estimator.count_messages(SYSTEM_PROMPT, render(""))
+        if token_estimator.count(content) > available:
+            content = token_estimator.truncate(content, max(available - 1, 0)) + "..."
+            logger.info(f"Content truncated to {len(content)} characters to fit {settings.PROMPT_MAX_TOKENS} prompt tokens")
+        
+        return render(content)
+    
+    @staticmethod
+    def dedup_scope(source_type: str, content: str) -> str:
+        """History scope for duplicate detection: the normalized topic or the PDF content hash"""
+        if source_type == "pdf":
+            return f"pdf:{hashlib.sha256(content.encode('utf-8')).hexdigest()}"
+        return f"topic:{' '.join(content.lower().split())}"
     
     @staticmethod
-    async def generate_mcqs_from_topic(topic: str, num_questions: int, difficulty: str, question_type: str) -> MCQResponse:
-        """Generate MCQs from a topic"""
+    async def call_groq(prompt: str, num_questions: int, background: bool = False,
+                        tenant: str = ANONYMOUS_TENANT, priority: str = "interactive") -> dict:
+        """Call Groq through the tenant scheduler with `max_tokens` sized for the request
+
+        A completion cut off at the estimated `max_tokens` widens the estimate
+        and is retried once with MAX_TOKENS.
+        """
+        max_tokens = token_estimator.max_tokens_for(num_questions)
+        prompt_tokens = token_estimator.count_messages(SYSTEM_PROMPT, prompt)
+        try:
+            result = await MCQService._scheduled_call(prompt, max_tokens, prompt_tokens, background, tenant, priority)
+        except CompletionTruncatedError:
+            token_estimator.observe_truncated(num_questions, max_tokens)
+            if max_tokens >= settings.MAX_TOKENS:
+                raise
+            max_tokens = settings.MAX_TOKENS
+            logger.info(f"Retrying truncated completion with max_tokens={max_tokens}")
+            result = await MCQService._scheduled_call(prompt, max_tokens, prompt_tokens, background, tenant, priority)
+        usage = result.setdefault("usage", {})
+        usage["max_tokens"] = max_tokens
+        token_estimator.observe(
+            (SYSTEM_PROMPT, prompt),
+            usage.get("prompt_tokens", 0),
+            len(result.get("questions", [])),
+            usage.get("completion_tokens", 0)
+        )
+        return result
+    
+    @staticmethod
+    async def _scheduled_call(prompt: str, max_tokens: int, prompt_tokens: int, background: bool,
+                              tenant: str, priority: str) -> dict:
+        return await tenant_scheduler.run(
+            tenant, priority, prompt_tokens + max_tokens,
+            lambda: groq_service.generate_mcqs(prompt, background=background, max_tokens=max_tokens)
+        )
+    
+    @staticmethod
+    async def generate_mcqs_from_topic(topic: str, num_questions: int, difficulty: str, question_type: str,
+                                       tenant: str = ANONYMOUS_TENANT, priority: str = "interactive",
+                                       use_cache: bool = True) -> MCQResponse:
+        """Generate MCQs from a topic, serving repeated requests from the cache
+
+        With `use_cache=False` a new set is generated and replaces the cached one.
+        """
+        if not (settings.CACHE_ENABLED and use_cache):
+            return await MCQService.regenerate_topic(
+                topic, num_questions, difficulty, question_type, tenant=tenant, priority=priority
+            )
+
+        key = cache_service.make_key("topic", topic, num_questions, difficulty, question_type)
+        cache_service.record_request(key, {
+            "topic": topic,
+            "num_questions": num_questions,
+            "difficulty": difficulty,
+            "question_type": question_type
+        })
+        cached = cache_service.get(key)
+        if cached is not None:
+            logger.info(f"Cache hit for topic: {topic}")
+            tenant_scheduler.record_cache_hit(tenant)
+            return cached
+
+        return await MCQService.regenerate_topic(
+            topic, num_questions, difficulty, question_type, tenant=tenant, priority=priority
+        )
+
+    @staticmethod
+    async def regenerate_topic(topic: str, num_questions: int, difficulty: str, question_type: str, background: bool = False,
+                               tenant: str = ANONYMOUS_TENANT, priority: str = "interactive") -> MCQResponse:
+        """Call Groq for a topic and refresh its cache entry"""
         try:
             logger.info(f"Generating {num_questions} MCQs for topic: {topic}")
             
-            prompt = MCQService.create_mcq_prompt(
-                content=topic,
-                num_questions=num_questions,
-                difficulty=difficulty,
-                question_type=question_type,
-                is_pdf=False
-            )
+            with track_stage("prompt_build"):
+                prompt = MCQService.create_mcq_prompt(
+                    content=topic,
+                    num_questions=num_questions,
+                    difficulty=difficulty,
+                    question_type=question_type,
+                    is_pdf=False
+                )
             
-            result = await groq_service.generate_mcqs(prompt)
+            with track_stage("groq_call"):
+                result = await MCQService.call_groq(
+                    prompt, num_questions, background=background, tenant=tenant, priority=priority
+                )
             
-            questions = []
-            for q_data in result.get("questions", []):
-                options = [MCQOption(**opt) for opt in q_data["options"]]
-                question = MCQuestion(
-                    question=q_data["question"],
-                    options=options,
-                    explanation=q_data["explanation"]
+            with track_stage("parse"):
+                questions = []
+                for q_data in result.get("questions", []):
+                    options = [MCQOption(**opt) for opt in q_data["options"]]
+                    question = MCQuestion(
+                        question=q_data["question"],
+                        options=options,
+                        explanation=q_data["explanation"]
+                    )
+                    questions.append(question)
+            
+            with track_stage("dedup"):
+                # Background refreshes replace the cached set, so only check within it
+                questions, dedup_metadata = dedup_service.apply(
+                    MCQService.dedup_scope("topic", topic), questions, use_history=not background
                 )
-                questions.append(question)
             
             response = MCQResponse(
                 questions=questions,
@@ -94,10 +196,19 @@ IMPORTANT: Return only valid JSON, no additional text or formatting.
                 metadata={
                     "difficulty": difficulty,
                     "question_type": question_type,
-                    "requested_questions": num_questions
+                    "requested_questions": num_questions,
+                    "prompt_tokens": result["usage"].get("prompt_tokens", 0),
+                    "completion_tokens": result["usage"].get("completion_tokens", 0),
+                    "max_tokens": result["usage"]["max_tokens"],
+                    **dedup_metadata
                 }
             )
             
+            # A set shortened by duplicate removal is served once but never reused
+            if settings.CACHE_ENABLED and not dedup_metadata.get("duplicates_removed"):
+                key = cache_service.make_key("topic", topic, num_questions, difficulty, question_type)
+                cache_service.set(key, response, tokens=result["usage"].get("total_tokens", 0))
+            
             logger.info(f"Successfully generated {len(questions)} MCQs from topic")
             return response
             
@@ -106,30 +217,49 @@ IMPORTANT: Return only valid JSON, no additional text or formatting.
             raise
     
     @staticmethod
-    async def generate_mcqs_from_pdf(pdf_content: str, num_questions: int, difficulty: str, question_type: str) -> MCQResponse:
-        """Generate MCQs from PDF content"""
+    async def generate_mcqs_from_pdf(pdf_content: str, num_questions: int, difficulty: str, question_type: str,
+                                     tenant: str = ANONYMOUS_TENANT, priority: str = "interactive",
+                                     use_cache: bool = True) -> MCQResponse:
+        """Generate MCQs from PDF content, serving repeated uploads from the cache
+
+        With `use_cache=False` a new set is generated and replaces the cached one.
+        """
+        key = cache_service.make_key("pdf", pdf_content, num_questions, difficulty, question_type)
+        if settings.CACHE_ENABLED and use_cache:
+            cached = cache_service.get(key)
+            if cached is not None:
+                logger.info("Cache hit for PDF content")
+                tenant_scheduler.record_cache_hit(tenant)
+                return cached
+
         try:
             logger.info(f"Generating {num_questions} MCQs from PDF content")
             
-            prompt = MCQService.create_mcq_prompt(
-                content=pdf_content,
-                num_questions=num_questions,
-                difficulty=difficulty,
-                question_type=question_type,
-                is_pdf=True
-            )
+            with track_stage("prompt_build"):
+                prompt = MCQService.create_mcq_prompt(
+                    content=pdf_content,
+                    num_questions=num_questions,
+                    difficulty=difficulty,
+                    question_type=question_type,
+                    is_pdf=True
+                )
             
-            result = await groq_service.generate_mcqs(prompt)
+            with track_stage("groq_call"):
+                result = await MCQService.call_groq(prompt, num_questions, tenant=tenant, priority=priority)
             
-            questions = []
-            for q_data in result.get("questions", []):
-                options = [MCQOption(**opt) for opt in q_data["options"]]
-                question = MCQuestion(
-                    question=q_data["question"],
-                    options=options,
-                    explanation=q_data["explanation"]
-                )
-                questions.append(question)
+            with track_stage("parse"):
+                questions = []
+                for q_data in result.get("questions", []):
+                    options = [MCQOption(**opt) for opt in q_data["options"]]
+                    question = MCQuestion(
+                        question=q_data["question"],
+                        options=options,
+                        explanation=q_data["explanation"]
+                    )
+                    questions.append(question)
+            
+            with track_stage("dedup"):
+                questions, dedup_metadata = dedup_service.apply(MCQService.dedup_scope("pdf", pdf_content), questions)
             
             response = MCQResponse(
                 questions=questions,
@@ -140,10 +270,17 @@ IMPORTANT: Return only valid JSON, no additional text or formatting.
                     "difficulty": difficulty,
                     "question_type": question_type,
                     "requested_questions": num_questions,
-                    "content_length": len(pdf_content)
+                    "content_length": len(pdf_content),
+                    "prompt_tokens": result["usage"].get("prompt_tokens", 0),
+                    "completion_tokens": result["usage"].get("completion_tokens", 0),
+                    "max_tokens": result["usage"]["max_tokens"],
+                    **dedup_metadata
                 }
             )
             
+            if settings.CACHE_ENABLED and not dedup_metadata.get("duplicates_removed"):
+                cache_service.set(key, response, tokens=result["usage"].get("total_tokens", 0))
+            
             logger.info(f"Successfully generated {len(questions)} MCQs from PDF")
             return response
             
@@ -0,0 +1,169 @@
+from app.config import settings
+from app.utils.security import is_admin_token
+from collections import Counter, OrderedDict, deque
+from datetime import datetime
+from typing import Dict, List, Optional
+import logging
+import os
+import sys
+import threading
+import tracemalloc
+
+logger = logging.getLogger(__name__)
+
+class StackSampler:
+    """Sample the stack of one thread at a fixed interval from a helper thread"""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+)
+
+class RequestProfile:
+    """Profiling state for a single request"""
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.started_at = datetime.now().isoformat()
+        self.sampler = StackSampler(threading.get_ident(), settings.PROFILING_SAMPLE_INTERVAL_MS / 1000)
+        self.start_snapshot: Optional[tracemalloc.Snapshot] = None
+        self.start_bytes = 0
+
+class ProfilingService:
+    """Opt-in per-request CPU/memory profiling and slow request tracking
+
+    Everything here is skipped unless PROFILING_ENABLED is set.
+    """
+
+    def __init__(self):
+        self._reports: "OrderedDict[str, dict]" = OrderedDict()
+        self._recent: deque = deque(maxlen=settings.SLOW_REQUESTS_WINDOW)
+        self._tracemalloc_users = 0
+        self._started_tracing = False
+        self._lock = threading.Lock()
+
+    def is_requested(self, headers, query_params) -> bool:
+        """Whether this request asked for profiling with a valid admin token"""
+        flag = headers.get("X-Profile") or query_params.get("profile")
+        if flag not in ("1", "true"):
+            return False
+        return is_admin_token(headers.get("X-Admin-Token"))
+
+    def start(self, request_id: str) -> RequestProfile:
+        """Begin sampling the current thread and tracing allocations
+
+        Tracing started elsewhere (e.g. by a benchmark) is reused and left
+        running when the last profiled request finishes.
+        """
+        profile = RequestProfile(request_id)
+        with self._lock:
+            if self._tracemalloc_users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            self._tracemalloc_users += 1
+        tracemalloc.reset_peak()
+        profile.start_bytes = tracemalloc.get_traced_memory()[0]
+        profile.start_snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        profile.sampler.start()
+        return profile
+
+    def finish(self, profile: RequestProfile, duration_ms: float, stages: Dict[str, float]) -> dict:
+        """Stop profiling and store the report"""
+        profile.sampler.stop()
+        snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        current, peak = tracemalloc.get_traced_memory()
+        with self._lock:
+            self._tracemalloc_users -= 1
+            if self._tracemalloc_users == 0 and self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+        top_allocations = [
+            {"location": str(stat.traceback), "size_diff_bytes": stat.size_diff, "count_diff": stat.count_diff}
+            for stat in snapshot.compare_to(profile.start_snapshot, "lineno")[:settings.PROFILING_TRACEMALLOC_TOP]
+        ]
+        sampler = profile.sampler
+        report = {
+            "request_id": profile.request_id,
+            "started_at": profile.started_at,
+            "duration_ms": duration_ms,
+            "stages": stages,
+            "cpu": {
+                "note": "Sampled from the shared event loop thread, so concurrent requests are included",
+                "interval_ms": settings.PROFILING_SAMPLE_INTERVAL_MS,
+                "samples": sampler.samples,
+                "stacks": [
+                    {"stack": stack, "samples": count}
+                    for stack, count in sampler.stacks.most_common(50)
+                ]
+            },
+            "memory": {
+                "note": "Deltas since this request started; concurrent requests are included",
+                "allocated_bytes": current - profile.start_bytes,
+                "peak_above_start_bytes": peak - profile.start_bytes,
+                "top_allocations": top_allocations
+            }
+        }
+
+        self._reports[profile.request_id] = report
+        while len(self._reports) > settings.PROFILING_MAX_REPORTS:
+            self._reports.popitem(last=False)
+        logger.info(f"Stored profile for request {profile.request_id}")
+        return report
+
+    def get_report(self, request_id: str) -> Optional[dict]:
+        return self._reports.get(request_id)
+
+    def list_reports(self) -> List[dict]:
+        return [
+            {"request_id": r["request_id"], "started_at": r["started_at"], "duration_ms": r["duration_ms"]}
+            for r in reversed(self._reports.values())
+        ]
+
+    def record_request(self, request_id: str, method: str, path: str, status_code: int,
+                       duration_ms: float, stages: Dict[str, float]) -> None:
+        """Remember a completed request for the slow request report"""
+        self._recent.append({
+            "request_id": request_id,
+            "method": method,
+            "path": path,
+            "status_code": status_code,
+            "duration_ms": duration_ms,
+            "stages": stages,
+            "finished_at": datetime.now().isoformat()
+        })
+
+    def slowest_requests(self, limit: int) -> List[dict]:
+        """Slowest of the recently completed requests, slowest first"""
+        return sorted(self._recent, key=lambda r: r["duration_ms"], reverse=True)[:limit]
+
+# Global instance
+profiling_service = ProfilingService()
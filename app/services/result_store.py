@@ -0,0 +1,85 @@
+from app.config import settings
+from app.models.response_models import MCQResponse
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+import gzip
+import hashlib
+import logging
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+class StoredResult:
+    """Serialized quiz set with its ETag and lazily built compressed bodies"""
+
+    def __init__(self, result_id: str, body: bytes, etag: str):
+        self.id = result_id
+        self.body = body
+        self.etag = etag
+        self.tenants: Set[str] = set()
+        self._encoded: Dict[str, bytes] = {}
+
+    def encoded(self, encoding: str) -> bytes:
+        """Body in `encoding` ("identity", "gzip" or "br"), compressed once"""
+        if encoding == "identity":
+            return self.body
+        if encoding not in self._encoded:
+            if encoding == "br":
+                self._encoded[encoding] = brotli.compress(self.body, quality=settings.BROTLI_QUALITY)
+            else:
+                self._encoded[encoding] = gzip.compress(self.body, compresslevel=settings.GZIP_LEVEL, mtime=0)
+        return self._encoded[encoding]
+
+class ResultStore:
+    """Bounded store of generated quiz sets, addressable by a content-derived id"""
+
+    def __init__(self):
+        self._results: "OrderedDict[str, StoredResult]" = OrderedDict()
+
+    @staticmethod
+    def supported_encodings() -> tuple:
+        return ("br", "gzip") if brotli is not None else ("gzip",)
+
+    def put(self, response: MCQResponse, tenant: Optional[str] = None) -> StoredResult:
+        """Assign `response` its id (if needed) and store its serialized form
+
+        `tenant` is recorded as allowed to fetch the result.
+        """
+        if response.id is not None and response.id in self._results:
+            self._results.move_to_end(response.id)
+            stored = self._results[response.id]
+            if tenant is not None:
+                stored.tenants.add(tenant)
+            return stored
+
+        if response.id is None:
+            content = response.model_dump_json(exclude={"id"}).encode("utf-8")
+            response.id = hashlib.sha256(content).hexdigest()[:20]
+        body = response.model_dump_json().encode("utf-8")
+        stored = StoredResult(response.id, body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+        if tenant is not None:
+            stored.tenants.add(tenant)
+
+        self._results[stored.id] = stored
+        while len(self._results) > settings.RESULT_STORE_MAX_ENTRIES:
+            self._results.popitem(last=False)
+        return stored
+
+    def get(self, result_id: str, tenant: Optional[str] = None) -> Optional[StoredResult]:
+        """Stored result by id; with `tenant`, only if that tenant was served it"""
+        stored = self._results.get(result_id)
+        if stored is not None and tenant is not None and tenant not in stored.tenants:
+            return None
+        if stored is not None:
+            self._results.move_to_end(result_id)
+        return stored
+
+    def clear(self) -> None:
+        self._results.clear()
+
+# Global instance
+result_store = ResultStore()
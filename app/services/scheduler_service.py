@@ -0,0 +1,241 @@
+from app.config import settings
+from app.utils.exceptions import QuotaExceededError
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+ANONYMOUS_TENANT = "anonymous"
+SYSTEM_TENANT = "system"
+PRIORITIES = ("interactive", "batch")  # highest first
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate` per second up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.level = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def available(self) -> float:
+        self._refill()
+        return self.level
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` can be taken"""
+        self._refill()
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate if self.rate > 0 else float("inf")
+
+    def take(self, amount: float) -> None:
+        """Take `amount`; the level may go negative to record debt"""
+        self._refill()
+        self.level -= amount
+
+@dataclass
+class TenantUsage:
+    requests: int = 0
+    interactive_requests: int = 0
+    batch_requests: int = 0
+    cache_hits: int = 0
+    rejected: int = 0
+    errors: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    queue_wait_ms: float = 0.0
+
+@dataclass(order=True)
+class _Ticket:
+    finish_tag: float
+    seq: int
+    future: asyncio.Future = field(compare=False)
+
+class TenantScheduler:
+    """Weighted fair queuing of upstream Groq calls across tenants
+
+    Each call is charged against its tenant's request and token buckets,
+    then waits for one of SCHEDULER_MAX_CONCURRENCY upstream slots. Waiting
+    calls are ordered by virtual finish time (cost / tenant weight), and
+    interactive calls are always dispatched before batch calls.
+    """
+
+    def __init__(self):
+        self._queues: Dict[str, List[_Ticket]] = {priority: [] for priority in PRIORITIES}
+        self._active = 0
+        self._virtual_time = 0.0
+        self._last_finish: Dict[str, float] = {}
+        self._seq = itertools.count()
+        self._buckets: Dict[str, Dict[str, TokenBucket]] = {}
+        self.usage: Dict[str, TenantUsage] = {}
+
+    @staticmethod
+    def resolve_tenant(api_key: Optional[str]) -> Optional[str]:
+        """Tenant for an API key; None if the key is required or unknown"""
+        if not api_key:
+            return None if settings.TENANT_REQUIRE_API_KEY else ANONYMOUS_TENANT
+        return settings.TENANT_API_KEYS.get(api_key)
+
+    @staticmethod
+    def resolve_priority(tenant: str, requested: Optional[str]) -> str:
+        """Scheduling class for a request, within the tenant's configured limits
+
+        Without a valid X-Priority the tenant's default applies; a tenant
+        whose maximum is batch cannot request interactive.
+        """
+        policy = settings.TENANT_PRIORITIES.get(tenant, {})
+        default = policy.get("default", settings.TENANT_DEFAULT_PRIORITY)
+        maximum = policy.get("max", PRIORITIES[0])
+        priority = requested if requested in PRIORITIES else default
+        priority = priority if priority in PRIORITIES else PRIORITIES[0]
+        if maximum in PRIORITIES and PRIORITIES.index(priority) < PRIORITIES.index(maximum):
+            priority = maximum
+        return priority
+
+    @staticmethod
+    def weight(tenant: str) -> float:
+        return max(settings.TENANT_WEIGHTS.get(tenant, 1.0), 1e-6)
+
+    def _tenant_buckets(self, tenant: str) -> Dict[str, Optional[TokenBucket]]:
+        """Request and token buckets for `tenant`; None where the quota is disabled"""
+        buckets = self._buckets.get(tenant)
+        if buckets is None:
+            quota = settings.TENANT_QUOTAS.get(tenant, {})
+            buckets = self._buckets[tenant] = {}
+            for name, rate_key, burst_key, rate, burst in (
+                ("requests", "requests_per_minute", "request_burst",
+                 settings.TENANT_REQUESTS_PER_MINUTE, settings.TENANT_REQUEST_BURST),
+                ("tokens", "tokens_per_minute", "token_burst",
+                 settings.TENANT_TOKENS_PER_MINUTE, settings.TENANT_TOKEN_BURST),
+            ):
+                per_minute = quota.get(rate_key, rate)
+                buckets[name] = TokenBucket(per_minute / 60, quota.get(burst_key, burst)) if per_minute > 0 else None
+        return buckets
+
+    def _usage(self, tenant: str) -> TenantUsage:
+        if tenant not in self.usage:
+            self.usage[tenant] = TenantUsage()
+        return self.usage[tenant]
+
+    def record_cache_hit(self, tenant: str) -> None:
+        """Count a request served from the response cache without an upstream call"""
+        self._usage(tenant).cache_hits += 1
+
+    def _charge(self, tenant: str, cost: int) -> None:
+        buckets = self._tenant_buckets(tenant)
+        requests, tokens = buckets["requests"], buckets["tokens"]
+        wait = max(
+            requests.wait_time(1) if requests else 0.0,
+            tokens.wait_time(min(cost, tokens.capacity)) if tokens else 0.0
+        )
+        if wait > 0:
+            self._usage(tenant).rejected += 1
+            raise QuotaExceededError(f"Quota exceeded for tenant {tenant}", retry_after=wait)
+        if requests:
+            requests.take(1)
+        if tokens:
+            tokens.take(cost)
+
+    async def _acquire(self, tenant: str, priority: str, cost: int) -> None:
+        if self._active < settings.SCHEDULER_MAX_CONCURRENCY and not any(self._queues.values()):
+            self._active += 1
+            return
+        finish_tag = max(self._virtual_time, self._last_finish.get(tenant, 0.0)) + cost / self.weight(tenant)
+        self._last_finish[tenant] = finish_tag
+        ticket = _Ticket(finish_tag, next(self._seq), asyncio.get_running_loop().create_future())
+        heapq.heappush(self._queues[priority], ticket)
+        try:
+            await ticket.future
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before cancellation
+            if ticket.future.done() and not ticket.future.cancelled():
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        for priority in PRIORITIES:
+            queue = self._queues[priority]
+            while queue:
+                ticket = heapq.heappop(queue)
+                if ticket.future.done():
+                    continue
+                self._virtual_time = max(self._virtual_time, ticket.finish_tag)
+                ticket.future.set_result(None)
+                return
+        self._active -= 1
+
+    async def run(self, tenant: str, priority: str, cost: int, call: Callable[[], Awaitable[dict]]) -> dict:
+        """Run an upstream call for `tenant` once quota and a fair-share slot allow
+
+        `cost` is the estimated token cost; the token bucket is corrected
+        with the usage the call reports.
+        """
+        priority = priority if priority in PRIORITIES else "interactive"
+        self._charge(tenant, cost)
+        usage = self._usage(tenant)
+        usage.requests += 1
+        setattr(usage, f"{priority}_requests", getattr(usage, f"{priority}_requests") + 1)
+
+        queued_at = time.perf_counter()
+        await self._acquire(tenant, priority, cost)
+        usage.queue_wait_ms += (time.perf_counter() - queued_at) * 1000
+        try:
+            result = await call()
+        except Exception as e:
+            usage.errors += 1
+            # Failed calls that still report usage (e.g. truncated completions) are billed too
+            reported = getattr(e, "usage", None)
+            if isinstance(reported, dict):
+                self._record_usage(tenant, cost, reported)
+            raise
+        finally:
+            self._release()
+
+        self._record_usage(tenant, cost, result.get("usage", {}))
+        return result
+
+    def _record_usage(self, tenant: str, cost: int, reported: dict) -> None:
+        """Add reported token usage to the tenant's counters and correct its token bucket"""
+        usage = self._usage(tenant)
+        total = reported.get("total_tokens", 0)
+        tokens = self._tenant_buckets(tenant)["tokens"]
+        if total and tokens:
+            tokens.take(total - cost)
+        usage.prompt_tokens += reported.get("prompt_tokens", 0)
+        usage.completion_tokens += reported.get("completion_tokens", 0)
+        usage.total_tokens += total
+
+    def usage_report(self) -> Dict[str, dict]:
+        """Usage counters and remaining quota per tenant"""
+        report = {}
+        for tenant, usage in self.usage.items():
+            buckets = self._tenant_buckets(tenant)
+            report[tenant] = {
+                **vars(usage),
+                "queue_wait_ms": round(usage.queue_wait_ms, 3),
+                "weight": self.weight(tenant),
+                "requests_available": round(buckets["requests"].available(), 3) if buckets["requests"] else None,
+                "tokens_available": round(buckets["tokens"].available(), 3) if buckets["tokens"] else None
+            }
+        return report
+
+    def queued(self) -> Dict[str, int]:
+        return {priority: len(queue) for priority, queue in self._queues.items()}
+
+    def reset(self) -> None:
+        self.__init__()
+
+# Global instance
+tenant_scheduler = TenantScheduler()
@@ -0,0 +1,112 @@
+from app.config import settings
+import logging
+import math
+import re
+
+logger = logging.getLogger(__name__)
+
+# Approximates the pre-tokenizer of BPE models (Llama 3, GPT-4): words with
+# their leading space, runs of punctuation, and whitespace
+_PIECE_RE = re.compile(r"\s?[A-Za-z]+|\s?\d{1,3}|\s?[^\sA-Za-z\d]+|\s+")
+
+# Characters per token for a word piece before calibration, per model family
+_MODEL_CHARS_PER_PIECE_TOKEN = {
+    "llama": 6.0,
+    "mixtral": 5.0,
+    "gemma": 5.5,
+}
+
+# Chat formatting tokens added per message by the upstream API
+MESSAGE_OVERHEAD_TOKENS = 7
+# JSON wrapper around the questions array in a completion
+COMPLETION_OVERHEAD_TOKENS = 20
+
+class TokenEstimator:
+    """Local token estimator calibrated against upstream `usage` reports
+
+    Raw estimates come from a BPE-like piece count; `scale` corrects them
+    towards the prompt tokens the API reports, and `tokens_per_question`
+    tracks the mean and variance of observed completion size so `max_tokens`
+    follows the request and covers longer-than-average completions.
+    """
+
+    def __init__(self, model: str = None):
+        model = (model or settings.GROQ_MODEL).lower()
+        self.chars_per_piece_token = next(
+            (ratio for family, ratio in _MODEL_CHARS_PER_PIECE_TOKEN.items() if family in model), 5.0
+        )
+        self.scale = 1.0
+        self.tokens_per_question = float(settings.COMPLETION_TOKENS_PER_QUESTION)
+        self.tokens_per_question_var = 0.0
+        self.observations = 0
+        self.truncations = 0
+
+    def _piece_tokens(self, piece: str) -> int:
+        return max(1, math.ceil(len(piece.strip() or piece) / self.chars_per_piece_token))
+
+    def raw_count(self, text: str) -> int:
+        return sum(self._piece_tokens(piece) for piece in _PIECE_RE.findall(text))
+
+    def count(self, text: str) -> int:
+        """Estimated token count of `text`"""
+        return math.ceil(self.raw_count(text) * self.scale)
+
+    def count_messages(self, *contents: str) -> int:
+        """Estimated prompt tokens for chat messages with these contents"""
+        return sum(self.count(content) + MESSAGE_OVERHEAD_TOKENS for content in contents)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Longest prefix of `text` whose estimate fits in `max_tokens`"""
+        budget = max_tokens / self.scale
+        used = 0
+        end = 0
+        for match in _PIECE_RE.finditer(text):
+            used += self._piece_tokens(match.group())
+            if used > budget:
+                return text[:end]
+            end = match.end()
+        return text
+
+    def max_tokens_for(self, num_questions: int) -> int:
+        """Completion budget for `num_questions`, capped at MAX_TOKENS
+
+        Sized for COMPLETION_TOKEN_STDDEVS standard deviations above the mean
+        tokens per question, plus COMPLETION_TOKEN_HEADROOM.
+        """
+        per_question = self.tokens_per_question + settings.COMPLETION_TOKEN_STDDEVS * math.sqrt(self.tokens_per_question_var)
+        estimate = (num_questions * per_question + COMPLETION_OVERHEAD_TOKENS) * settings.COMPLETION_TOKEN_HEADROOM
+        return min(settings.MAX_TOKENS, math.ceil(estimate))
+
+    def _observe_per_question(self, per_question: float) -> None:
+        # Exponentially weighted mean and variance
+        alpha = settings.TOKEN_CALIBRATION_ALPHA
+        diff = per_question - self.tokens_per_question
+        self.tokens_per_question += alpha * diff
+        self.tokens_per_question_var = (1 - alpha) * (self.tokens_per_question_var + alpha * diff * diff)
+
+    def observe(self, messages: tuple, prompt_tokens: int, num_questions: int, completion_tokens: int) -> None:
+        """Calibrate against the usage reported for one completion"""
+        alpha = settings.TOKEN_CALIBRATION_ALPHA
+        if prompt_tokens:
+            raw = sum(self.raw_count(content) for content in messages)
+            content_tokens = prompt_tokens - MESSAGE_OVERHEAD_TOKENS * len(messages)
+            if raw and content_tokens > 0:
+                self.scale += alpha * (content_tokens / raw - self.scale)
+        if completion_tokens and num_questions:
+            self._observe_per_question(max(completion_tokens - COMPLETION_OVERHEAD_TOKENS, 1) / num_questions)
+        self.observations += 1
+        logger.debug(f"Token estimator calibrated: scale={self.scale:.3f}, tokens_per_question={self.tokens_per_question:.1f}")
+
+    def observe_truncated(self, num_questions: int, max_tokens: int) -> None:
+        """Widen the estimate after a completion was cut off at `max_tokens`
+
+        The completion needed more than `max_tokens`, so that is recorded as
+        a lower bound of its size per question.
+        """
+        if num_questions:
+            self._observe_per_question(max(max_tokens - COMPLETION_OVERHEAD_TOKENS, 1) / num_questions)
+        self.truncations += 1
+        logger.info(f"Completion truncated at {max_tokens} tokens; tokens_per_question={self.tokens_per_question:.1f}")
+
+# Global instance
+token_estimator = TokenEstimator()
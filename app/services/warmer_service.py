@@ -0,0 +1,111 @@
+from app.config import settings
+from app.services.cache_service import cache_service
+from app.services.groq_service import groq_service
+from app.services.mcq_service import mcq_service
+from app.services.scheduler_service import SYSTEM_TENANT
+from datetime import datetime
+from typing import Optional
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class CacheWarmer:
+    """Background task that regenerates popular topic entries before they expire
+
+    Warming runs under an hourly token budget, only uses a share of the
+    upstream rate limit and backs off whenever live requests are in flight.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._window_start = time.monotonic()
+        self.tokens_used = 0
+
+    def start(self) -> None:
+        """Start the warmer loop if enabled"""
+        if not (settings.WARMER_ENABLED and settings.CACHE_ENABLED):
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info("Cache warmer started")
+
+    async def stop(self) -> None:
+        """Cancel the warmer loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("Cache warmer stopped")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.WARMER_INTERVAL_SECONDS)
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Cache warmer cycle failed: {str(e)}")
+
+    def _roll_window(self) -> None:
+        if time.monotonic() - self._window_start >= 3600:
+            self._window_start = time.monotonic()
+            self.tokens_used = 0
+            cache_service.decay_popularity()
+
+    @staticmethod
+    def _is_off_peak() -> bool:
+        return datetime.now().hour in settings.WARMER_OFF_PEAK_HOURS
+
+    def _is_due(self, key: str) -> bool:
+        remaining = cache_service.ttl_remaining(key)
+        if remaining is None or remaining <= settings.WARMER_REFRESH_BEFORE_EXPIRY_SECONDS:
+            return True
+        # Off-peak, refresh anything past half its TTL so peak hours start warm
+        return self._is_off_peak() and remaining <= settings.CACHE_TTL_SECONDS / 2
+
+    async def run_once(self) -> int:
+        """Warm due entries; returns the number of entries regenerated"""
+        self._roll_window()
+        warmed = 0
+
+        for key, stats in cache_service.popular_keys(settings.WARMER_MIN_HITS):
+            if groq_service.live_in_flight > 0:
+                logger.debug("Cache warmer yielding to live traffic")
+                break
+            if not groq_service.has_capacity(settings.WARMER_RATE_LIMIT_SHARE):
+                logger.debug("Cache warmer paused at upstream rate limit share")
+                break
+            if not self._is_due(key):
+                continue
+
+            entry = cache_service.get_entry(key)
+            estimate = entry.tokens if entry and entry.tokens else settings.MAX_TOKENS
+            if self.tokens_used + estimate > settings.WARMER_TOKENS_PER_HOUR:
+                logger.debug("Cache warmer token budget exhausted for this hour")
+                break
+
+            try:
+                await mcq_service.regenerate_topic(
+                    background=True, tenant=SYSTEM_TENANT, priority="batch", **stats.params
+                )
+            except Exception as e:
+                logger.warning(f"Failed to warm cache entry {key}: {str(e)}")
+                self.tokens_used += estimate
+                continue
+
+            entry = cache_service.get_entry(key)
+            self.tokens_used += entry.tokens if entry and entry.tokens else estimate
+            warmed += 1
+            # Let queued live requests run before the next upstream call
+            await asyncio.sleep(0)
+
+        if warmed:
+            logger.info(f"Cache warmer refreshed {warmed} entries ({self.tokens_used} tokens this hour)")
+        return warmed
+
+# Global instance
+cache_warmer = CacheWarmer()
@@ -6,6 +6,13 @@ class GroqAPIError(MCQGeneratorException):
     """Exception raised for Groq API errors"""
     pass
 
+class CompletionTruncatedError(GroqAPIError):
+    """Exception raised when a completion stops at its max_tokens limit"""
+    def __init__(self, message: str, max_tokens: int = 0, usage: dict = None):
+        super().__init__(message)
+        self.max_tokens = max_tokens
+        self.usage = usage or {}
+
 class PDFProcessingError(MCQGeneratorException):
     """Exception raised for PDF processing errors"""
     pass
@@ -16,4 +23,10 @@ class ValidationError(MCQGeneratorException):
 
 class ConfigurationError(MCQGeneratorException):
     """Exception raised for configuration errors"""
-    pass
\ No newline at end of file
+    pass
+
+class QuotaExceededError(MCQGeneratorException):
+    """Exception raised when a tenant exceeds its request or token quota"""
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
@@ -0,0 +1,55 @@
+from fastapi import Request
+from fastapi.responses import Response
+from app.config import settings
+from app.services.result_store import StoredResult, result_store
+from typing import Optional
+
+def negotiate_encoding(accept_encoding: Optional[str], size: int) -> str:
+    """Pick the best supported content coding, or "identity" for small bodies"""
+    if not accept_encoding or size < settings.COMPRESSION_MIN_SIZE:
+        return "identity"
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding.strip().lower()] = q
+    best, best_q = "identity", 0.0
+    for coding in result_store.supported_encodings():
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against `etag`"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in candidates)
+
+def stored_result_response(stored: StoredResult, request: Request, status_code: int = 200) -> Response:
+    """Serve stored quiz bytes with ETag, conditional GET and compression"""
+    headers = {
+        "ETag": stored.etag,
+        "Vary": "Accept-Encoding",
+        "Content-Location": f"/api/v1/results/{stored.id}"
+    }
+    if request.method == "GET" and etag_matches(request.headers.get("if-none-match"), stored.etag):
+        return Response(status_code=304, headers=headers)
+
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"), len(stored.body))
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(
+        content=stored.encoded(encoding),
+        status_code=status_code,
+        media_type="application/json",
+        headers=headers
+    )
@@ -1,22 +1,132 @@
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import queue
+import random
 import sys
+from datetime import datetime, timezone
+from typing import Optional
 from app.config import settings
+from app.utils.request_context import request_id_var
+
+# Attributes present on every LogRecord; anything else was passed via `extra`
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+# Log arguments of these types can be formatted on the listener thread
+_IMMUTABLE_ARG_TYPES = (str, int, float, bool, bytes, type(None))
+
+_exception_formatter = logging.Formatter()
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+class RequestContextFilter(logging.Filter):
+    """Attach the current request id to each record"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON, including any `extra` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                data[key] = value
+        if record.exc_text:
+            data["exc_info"] = record.exc_text
+        elif record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Queue a copy that is safe to format on the listener thread
+
+        Arguments that are plain immutable values are formatted later by the
+        listener; anything else is merged into the message now, since the
+        request may still mutate it. The traceback is rendered into
+        `exc_text`, which JsonFormatter emits as its own field.
+        """
+        record = copy.copy(record)
+        args = record.args if isinstance(record.args, tuple) else (record.args,)
+        if record.args and not all(isinstance(arg, _IMMUTABLE_ARG_TYPES) for arg in args):
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+def log_payload(logger: logging.Logger, message: str, payload) -> None:
+    """Log a response payload for a sampled fraction of requests"""
+    rate = settings.LOG_PAYLOAD_SAMPLE_RATE
+    if rate <= 0 or random.random() >= rate:
+        return
+    logger.info(message, extra={"payload": payload.model_dump(mode="json")})
+
+def stop_logging():
+    """Flush queued records and stop the background writer"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
 def setup_logging():
-    """Setup logging configuration"""
-    
+    """Setup logging configuration
+
+    Records are put on a queue by the calling thread and written to stdout by
+    a background listener thread, so log I/O stays off the request path.
+    """
+    global _listener
+    stop_logging()
+
     # Create formatter
-    formatter = logging.Formatter(settings.LOG_FORMAT)
-    
-    # Create console handler
+    if settings.LOG_JSON:
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(settings.LOG_FORMAT)
+
+    # Create console handler, driven by the background listener
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
-    
+
+    log_queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter())
+
     # Get root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(getattr(logging, settings.LOG_LEVEL))
-    root_logger.addHandler(console_handler)
-    
+    for handler in list(root_logger.handlers):
+        if isinstance(handler, DroppingQueueHandler):
+            root_logger.removeHandler(handler)
+    root_logger.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(log_queue, console_handler, respect_handler_level=True)
+    _listener.start()
+
     # Configure specific loggers
     loggers = [
         "app",
@@ -24,11 +134,21 @@ def setup_logging():
         "uvicorn.error",
         "uvicorn.access"
     ]
-    
+
     for logger_name in loggers:
         logger = logging.getLogger(logger_name)
         logger.setLevel(getattr(logging, settings.LOG_LEVEL))
-    
+        # Uvicorn installs its own synchronous stream handlers; route through the queue instead
+        if logger_name.startswith("uvicorn"):
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+            logger.propagate = True
+
+    # The request middleware logs every request, so the access log would only repeat it
+    logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
+
     # Suppress some noisy loggers
     logging.getLogger("httpx").setLevel(logging.WARNING)
-    logging.getLogger("groq").setLevel(logging.WARNING)
\ No newline at end of file
+    logging.getLogger("groq").setLevel(logging.WARNING)
+
+atexit.register(stop_logging)
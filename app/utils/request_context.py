@@ -0,0 +1,19 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+import time
+
+# Per-request state, set by the request middleware in app.main
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+stage_timings_var: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_timings", default=None)
+
+@contextmanager
+def track_stage(name: str):
+    """Add the elapsed time of the block (ms) to the current request's stage timings"""
+    timings = stage_timings_var.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[name] = round(timings.get(name, 0.0) + (time.perf_counter() - start) * 1000, 3)
@@ -0,0 +1,8 @@
+from app.config import settings
+from typing import Optional
+import hmac
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """Check a token against the configured ADMIN_TOKEN"""
+    expected = settings.ADMIN_TOKEN
+    return bool(expected and token and hmac.compare_digest(token, expected))
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark near-duplicate question detection
+
+Builds synthetic question sets against a history of thousands of distinct
+questions and reports time per question and three rates:
+
+- recall: paraphrases (reworded question, reworded and shuffled options)
+  detected as repeats
+- false pos: new questions on new concepts wrongly flagged
+- shared opts: different questions that reuse a stored question's option
+  list wrongly flagged (these would be dropped with DEDUP_MODE=drop)
+
+Usage: python benchmarks/bench_dedup.py [--history 1000 5000] [--queries 500]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("GROQ_API_KEY", "benchmark-key")
+
+from app.config import settings
+from app.models.response_models import MCQOption, MCQuestion
+from app.services.dedup_service import DedupService
+
+WORDS = (
+    "photosynthesis mitochondria enzyme protein osmosis diffusion chlorophyll nucleus membrane "
+    "ribosome glucose respiration catalyst neuron synapse hormone receptor antibody antigen "
+    "gravity momentum velocity friction inertia torque energy entropy voltage current resistance "
+    "democracy parliament treaty empire revolution constitution economy inflation tariff market"
+).split()
+
+TEMPLATES = [
+    "Which of the following best describes {c}?",
+    "Which of these best describes {c}?",
+    "Which option best describes {c}?",
+    "What best describes {c}?",
+    "{c} is best described by which of the following?",
+]
+
+def concept(rng: random.Random) -> str:
+    return " ".join(rng.sample(WORDS, 3))
+
+def reword(rng: random.Random, option: str) -> str:
+    """Drop or swap an article now and then, as a regenerated answer might"""
+    if option.startswith("the ") and rng.random() < 0.5:
+        return option[4:]
+    return option.replace(" of ", " of the ", 1) if rng.random() < 0.3 else option
+
+def make_question(rng: random.Random, subject: str, options: list, template: str,
+                  rephrase: bool = False) -> MCQuestion:
+    texts = [reword(rng, option) for option in options] if rephrase else options[:]
+    order = list(range(4))
+    rng.shuffle(order)
+    return MCQuestion(
+        question=template.format(c=subject),
+        options=[MCQOption(option=f"{letter}) {texts[i]}", is_correct=i == 0)
+                 for letter, i in zip("ABCD", order)],
+        explanation=f"{options[0]} is correct."
+    )
+
+def make_concept(rng: random.Random):
+    subject = concept(rng)
+    options = [f"the {concept(rng)} of {rng.choice(WORDS)}" for _ in range(4)]
+    return subject, options
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history", type=int, nargs="*", default=[1000, 5000])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'history':>8} {'us/question':>12} {'recall':>8} {'false pos':>10} {'shared opts':>12}")
+    for size in args.history:
+        rng = random.Random(args.seed)
+        settings.DEDUP_HISTORY_SIZE = settings.DEDUP_MAX_SIGNATURES = size + 3 * args.queries
+        service = DedupService()
+        concepts = [make_concept(rng) for _ in range(size)]
+        for start in range(0, size, 20):
+            batch = [make_question(rng, s, o, rng.choice(TEMPLATES)) for s, o in concepts[start:start + 20]]
+            service.find_duplicates("bench", batch)
+
+        paraphrases = [
+            make_question(rng, *concepts[rng.randrange(size)], rng.choice(TEMPLATES), rephrase=True)
+            for _ in range(args.queries)
+        ]
+        fresh = [make_question(rng, *make_concept(rng), rng.choice(TEMPLATES)) for _ in range(args.queries)]
+        shared_options = [
+            make_question(rng, concept(rng), concepts[rng.randrange(size)][1], rng.choice(TEMPLATES))
+            for _ in range(args.queries)
+        ]
+
+        counts = []
+        start = time.perf_counter()
+        for queries in (paraphrases, fresh, shared_options):
+            counts.append(sum(bool(service.find_duplicates("bench", [q])[1]) for q in queries) / args.queries)
+        per_question = (time.perf_counter() - start) / (3 * args.queries)
+
+        print(f"{size:>8} {per_question * 1e6:>12.1f} {counts[0]:>8.3f} {counts[1]:>10.3f} {counts[2]:>12.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Offline load test for the MCQ generation endpoints
+
+Starts the fake Groq server, points the app at it and drives
+`/api/v1/generate/topic` and `/api/v1/generate/pdf` (with synthetic PDFs of
+several page counts) at a fixed concurrency. Reports throughput, p50/p95/p99
+latency, error counts, questions returned and memory per scenario; `--json`
+writes the results for regression tracking.
+
+Memory is measured with tracemalloc per scenario: the peak allocated above
+the memory held when the scenario started, and what it still holds at the
+end. The fake server and the client run in the same process, so their
+allocations are included. `process_max_rss_kb` is the lifetime peak RSS of
+the whole process, not a per-scenario figure. Tracing slows requests several
+times over, so compare latency with `--no-trace-memory`.
+
+Usage: python benchmarks/bench_load.py --requests 200 --concurrency 16 --latency-ms 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.fake_groq_server import FakeGroqServer, add_config_arguments, config_from_args
+from benchmarks.synthetic_pdf import make_pdf
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+async def run_scenario(client, name: str, requests: int, concurrency: int, send) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    question_counts: List[int] = []
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await send(client, i)
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[response.status_code] += 1
+            if response.status_code == 200:
+                question_counts.append(response.json()["total_questions"])
+
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    peak_delta = retained_delta = None
+    if tracing:
+        current, peak = tracemalloc.get_traced_memory()
+        peak_delta, retained_delta = peak - baseline, current - baseline
+
+    return {
+        "scenario": name,
+        "requests": requests,
+        "concurrency": concurrency,
+        "throughput_rps": round(requests / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "status_codes": dict(statuses),
+        "min_questions": min(question_counts, default=None),
+        "mean_questions": round(sum(question_counts) / len(question_counts), 2) if question_counts else None,
+        "traced_peak_delta_bytes": peak_delta,
+        "traced_retained_delta_bytes": retained_delta,
+        "process_max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    }
+
+def topic_sender(num_questions: int):
+    async def send(client, i: int):
+        return await client.post("/api/v1/generate/topic", json={
+            "topic": f"Benchmark topic number {i}",
+            "num_questions": num_questions
+        })
+    return send
+
+def pdf_sender(pdf: bytes, num_questions: int):
+    async def send(client, i: int):
+        return await client.post(
+            "/api/v1/generate/pdf",
+            params={"num_questions": num_questions},
+            files={"file": (f"bench-{i}.pdf", pdf, "application/pdf")}
+        )
+    return send
+
+async def run(args) -> List[dict]:
+    import httpx
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    results = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        results.append(await run_scenario(
+            client, "topic", args.requests, args.concurrency, topic_sender(args.questions)
+        ))
+        for pages in args.pdf_pages:
+            results.append(await run_scenario(
+                client, f"pdf-{pages}p", args.requests, args.concurrency, pdf_sender(make_pdf(pages), args.questions)
+            ))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--pdf-pages", type=int, nargs="*", default=[1, 10, 50])
+    parser.add_argument("--cache", action="store_true", help="Leave the response cache enabled")
+    parser.add_argument("--no-trace-memory", dest="trace_memory", action="store_false",
+                        help="Skip tracemalloc, which slows requests, and report latency only")
+    parser.add_argument("--json", help="Write results to this file")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    if args.trace_memory:
+        tracemalloc.start()
+    with FakeGroqServer(config_from_args(args)) as server:
+        os.environ["GROQ_BASE_URL"] = server.base_url
+        os.environ.setdefault("GROQ_API_KEY", "benchmark-key")
+        os.environ["CACHE_ENABLED"] = "true" if args.cache else "false"
+        os.environ.setdefault("LOG_LEVEL", "WARNING")
+        results = asyncio.run(run(args))
+        upstream_calls = server.calls
+    tracemalloc.stop()
+
+    def mb(value) -> str:
+        return "-" if value is None else f"{value / 2 ** 20:.1f}"
+
+    print(f"{'scenario':<12} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak MB':>8} {'kept MB':>8} {'min q':>6}  status")
+    for r in results:
+        print(
+            f"{r['scenario']:<12} {r['throughput_rps']:>9} {r['p50_ms']:>9} {r['p95_ms']:>9} {r['p99_ms']:>9} "
+            f"{mb(r['traced_peak_delta_bytes']):>8} {mb(r['traced_retained_delta_bytes']):>8} {str(r['min_questions']):>6}  {r['status_codes']}"
+        )
+    print(f"upstream calls: {upstream_calls}")
+    print(f"process max RSS (lifetime, includes fake server and client): {results[-1]['process_max_rss_kb'] / 1024:.1f} MB")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({"args": vars(args), "results": results, "upstream_calls": upstream_calls}, fh, indent=2)
+
+if __name__ == "__main__":
+    main()
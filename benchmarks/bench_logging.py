@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-request logging overhead
+
+Compares the previous setup (synchronous StreamHandler, full MCQResponse
+logged on every request) with the queue-based JSON pipeline and sampled
+payload logging. Only the time spent on the calling thread is measured,
+which is what a request pays.
+
+Usage: python benchmarks/bench_logging.py [--requests 2000] [--questions 20]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("GROQ_API_KEY", "benchmark-key")
+
+from app.config import settings
+from app.models.response_models import MCQOption, MCQResponse, MCQuestion
+from app.utils import logging_config
+from app.utils.request_context import request_id_var, stage_timings_var, track_stage
+
+def build_response(num_questions: int) -> MCQResponse:
+    questions = [
+        MCQuestion(
+            question=f"Sample question number {i} about the benchmark topic?",
+            options=[MCQOption(option=f"{letter}) Option text {i}", is_correct=letter == "B") for letter in "ABCD"],
+            explanation="A reasonably long explanation of why the answer is correct. " * 5
+        )
+        for i in range(num_questions)
+    ]
+    return MCQResponse(
+        questions=questions,
+        generated_at="2024-01-01T12:00:00",
+        source_type="topic",
+        topic="Benchmark",
+        total_questions=num_questions,
+        metadata={"difficulty": "medium"}
+    )
+
+def reset_root(handler: logging.Handler = None):
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    if handler is not None:
+        root.addHandler(handler)
+    root.setLevel(logging.INFO)
+
+def bench_sync(response: MCQResponse, requests: int, stream) -> float:
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter(settings.LOG_FORMAT))
+    reset_root(handler)
+    logger = logging.getLogger("app.bench")
+    start = time.perf_counter()
+    for _ in range(requests):
+        logger.info("Generating 20 MCQs for topic: Benchmark")
+        logger.info(response)
+        logger.info("Request completed")
+    return (time.perf_counter() - start) / requests
+
+def bench_queue(response: MCQResponse, requests: int, stream, sample_rate: float) -> float:
+    reset_root()
+    settings.LOG_PAYLOAD_SAMPLE_RATE = sample_rate
+    logging_config.setup_logging()
+    listener = logging_config._listener
+    listener.handlers[0].setStream(stream)
+    logger = logging.getLogger("app.bench")
+    start = time.perf_counter()
+    for i in range(requests):
+        request_id_var.set(f"req-{i}")
+        stage_timings_var.set({})
+        with track_stage("groq_call"):
+            logger.info("Generating 20 MCQs for topic: Benchmark")
+        logging_config.log_payload(logger, "Generated MCQs from topic", response)
+        logger.info("Request completed", extra={"status_code": 200, "stages": stage_timings_var.get()})
+    elapsed = (time.perf_counter() - start) / requests
+    logging_config.stop_logging()
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--questions", type=int, default=20)
+    args = parser.parse_args()
+
+    response = build_response(args.questions)
+    with tempfile.TemporaryFile("w") as stream:
+        results = [
+            ("sync handler, full payload", bench_sync(response, args.requests, stream)),
+            ("queue + JSON, payload sampled 0%", bench_queue(response, args.requests, stream, 0.0)),
+            ("queue + JSON, payload sampled 1%", bench_queue(response, args.requests, stream, 0.01)),
+            ("queue + JSON, payload sampled 100%", bench_queue(response, args.requests, stream, 1.0)),
+        ]
+    reset_root()
+
+    print(f"Logging overhead per request ({args.requests} requests, {args.questions} questions)")
+    for name, seconds in results:
+        print(f"  {name:<36} {seconds * 1e6:10.1f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Groq API
+
+Speaks the OpenAI-compatible chat completions endpoint used by the Groq SDK
+(`POST /openai/v1/chat/completions`), including `stream=true` server-sent
+events, and answers with MCQ JSON shaped like the real model output. Latency,
+429 rate limiting and truncated or malformed JSON can be injected so the app
+can be tested and benchmarked offline.
+
+Usage: python benchmarks/fake_groq_server.py --port 8100 --latency lognormal --latency-ms 800
+Then start the app with GROQ_BASE_URL=http://127.0.0.1:8100
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+LATENCY_DISTRIBUTIONS = ["fixed", "uniform", "normal", "lognormal"]
+
+@dataclass
+class FakeGroqConfig:
+    """Fault and latency injection settings
+
+    latency_ms is the mean (median for lognormal). latency_spread is the
+    half-width in ms for uniform, the standard deviation in ms for normal and
+    the sigma of the underlying normal for lognormal.
+    """
+    latency: str = "fixed"
+    latency_ms: float = 0.0
+    latency_spread: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after_ms: int = 10
+    truncated_rate: float = 0.0
+    malformed_rate: float = 0.0
+    stream_chunk_chars: int = 64
+    seed: Optional[int] = None
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """Latency for one call, in seconds"""
+        mean, spread = self.latency_ms, self.latency_spread
+        if self.latency == "uniform":
+            value = rng.uniform(mean - spread, mean + spread)
+        elif self.latency == "normal":
+            value = rng.gauss(mean, spread)
+        elif self.latency == "lognormal":
+            value = rng.lognormvariate(math.log(mean), spread) if mean > 0 else 0.0
+        else:
+            value = mean
+        return max(value, 0.0) / 1000
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+FACETS = (
+    "history origin cause effect structure function process stage example exception rule measure "
+    "property limit benefit risk method tool model theory evidence debate trend impact scale cost "
+    "pattern source purpose context outcome principle variation balance feedback boundary signal "
+    "resource constraint mechanism definition application component sequence threshold capacity"
+).split()
+
+SYLLABLES = "ka lo mi nu pe ra si to vu ze ba de fi go hu ja ke li mo ny".split()
+
+def pseudo_word(rng: random.Random) -> str:
+    return "".join(rng.choices(SYLLABLES, k=4))
+
+def build_mcq_content(prompt: str) -> str:
+    """Answer an MCQ prompt with the number of questions it asks for
+
+    Questions for the same topic are deterministic but worded differently,
+    so they are not mistaken for near-duplicates of each other.
+    """
+    match = re.search(r"Create (\d+) ", prompt)
+    num_questions = int(match.group(1)) if match else 1
+    topic_match = re.search(r"Content/Topic: (.{0,60})", prompt)
+    topic = topic_match.group(1).strip() if topic_match else "the topic"
+    questions = []
+    for i in range(num_questions):
+        rng = random.Random(f"{topic}:{i}")
+        facet, *claims = rng.sample(FACETS, 9)
+        correct = i % 4
+        questions.append({
+            "question": f"Question {i + 1}: which statement about the {facet} of {topic} is accurate?",
+            "options": [
+                {"option": f"{letter}) The {claims[2 * j]} {pseudo_word(rng)} {claims[2 * j + 1]}", "is_correct": j == correct}
+                for j, letter in enumerate("ABCD")
+            ],
+            "explanation": f"Statement {'ABCD'[correct]} is accurate; the other statements misdescribe {topic}."
+        })
+    return json.dumps({"questions": questions})
+
+def create_app(config: FakeGroqConfig) -> FastAPI:
+    app = FastAPI(title="Fake Groq API")
+    rng = random.Random(config.seed)
+    app.state.config = config
+    app.state.calls = 0
+
+    @app.get("/openai/v1/models")
+    async def list_models():
+        return {"object": "list", "data": [{"id": "llama-3.1-8b-instant", "object": "model"}]}
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        app.state.calls += 1
+        body = await request.json()
+        await asyncio.sleep(config.sample_latency(rng))
+
+        if rng.random() < config.rate_limit_rate:
+            return JSONResponse(
+                status_code=429,
+                headers={"retry-after-ms": str(config.retry_after_ms)},
+                content={"error": {
+                    "message": "Rate limit reached for model",
+                    "type": "tokens",
+                    "code": "rate_limit_exceeded"
+                }}
+            )
+
+        prompt = "\n".join(m.get("content", "") for m in body.get("messages", []))
+        content = build_mcq_content(prompt)
+        fault = rng.random()
+        if fault < config.truncated_rate:
+            content = content[:len(content) // 2]
+        elif fault < config.truncated_rate + config.malformed_rate:
+            content = content[:-1] + ",}"
+
+        max_tokens = body.get("max_tokens")
+        finish_reason = "stop"
+        if max_tokens and estimate_tokens(content) > max_tokens:
+            content = content[:max_tokens * 4]
+            finish_reason = "length"
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        model = body.get("model", "llama-3.1-8b-instant")
+        usage = {
+            "prompt_tokens": estimate_tokens(prompt),
+            "completion_tokens": estimate_tokens(content),
+            "total_tokens": estimate_tokens(prompt) + estimate_tokens(content)
+        }
+
+        if body.get("stream"):
+            async def events():
+                step = max(config.stream_chunk_chars, 1)
+                for i in range(0, len(content), step):
+                    chunk = {
+                        "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                        "choices": [{"index": 0, "delta": {"role": "assistant", "content": content[i:i + step]}, "finish_reason": None}]
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                    await asyncio.sleep(0)
+                final = {
+                    "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}],
+                    "x_groq": {"id": completion_id, "usage": usage}
+                }
+                yield f"data: {json.dumps(final)}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": finish_reason
+            }],
+            "usage": usage
+        }
+
+    return app
+
+class FakeGroqServer:
+    """Run the fake API in a background thread
+
+    with FakeGroqServer(FakeGroqConfig(latency_ms=50)) as server:
+        os.environ["GROQ_BASE_URL"] = server.base_url
+    """
+
+    def __init__(self, config: Optional[FakeGroqConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or FakeGroqConfig()
+        self.app = create_app(self.config)
+        if port == 0:
+            with socket.socket() as sock:
+                sock.bind((host, 0))
+                port = sock.getsockname()[1]
+        self.host, self.port = host, port
+        self._server = uvicorn.Server(uvicorn.Config(self.app, host=host, port=port, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, name="fake-groq", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def calls(self) -> int:
+        return self.app.state.calls
+
+    def start(self) -> "FakeGroqServer":
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("Fake Groq server failed to start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
+
+    def __enter__(self) -> "FakeGroqServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-spread", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of calls answered with 429")
+    parser.add_argument("--truncated-rate", type=float, default=0.0, help="Fraction of calls with truncated JSON")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Fraction of calls with malformed JSON")
+    parser.add_argument("--seed", type=int, default=None)
+
+def config_from_args(args: argparse.Namespace) -> FakeGroqConfig:
+    return FakeGroqConfig(
+        latency=args.latency,
+        latency_ms=args.latency_ms,
+        latency_spread=args.latency_spread,
+        rate_limit_rate=args.rate_limit_rate,
+        truncated_rate=args.truncated_rate,
+        malformed_rate=args.malformed_rate,
+        seed=args.seed
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+    print(f"Fake Groq API listening on http://{args.host}:{args.port}")
+    uvicorn.run(create_app(config_from_args(args)), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Minimal synthetic PDF writer for benchmarks and tests
+
+Produces valid single-font text PDFs with a given number of pages without
+any extra dependency.
+"""
+from typing import List
+
+SENTENCES = [
+    "Machine learning is a subset of artificial intelligence that learns from data.",
+    "Supervised learning uses labeled examples to train predictive models.",
+    "Unsupervised learning finds structure in data without labels.",
+    "Reinforcement learning trains agents through rewards and penalties.",
+    "Overfitting happens when a model memorizes noise instead of the signal.",
+    "Cross validation estimates how well a model generalizes to unseen data.",
+]
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def page_lines(page_number: int, lines_per_page: int = 40) -> List[str]:
+    return [
+        f"Page {page_number + 1}, line {i + 1}: {SENTENCES[(page_number + i) % len(SENTENCES)]}"
+        for i in range(lines_per_page)
+    ]
+
+def make_pdf(pages: int, lines_per_page: int = 40) -> bytes:
+    """Build a PDF with `pages` pages of text"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in below
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for page in range(pages):
+        text = "BT /F1 10 Tf 12 TL 40 800 Td " + " ".join(
+            f"({_escape(line)}) '" for line in page_lines(page, lines_per_page)
+        ) + " ET"
+        stream = text.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % pages
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
@@ -31,7 +31,7 @@ def main():
         port=port,
         reload=settings.DEBUG,
         log_level=settings.LOG_LEVEL.lower(),
-        access_log=True
+        access_log=False  # Requests are logged by the app's request middleware
     )
 
 if __name__ == "__main__":
@@ -6,6 +6,38 @@ from unittest.mock import Mock
 # Add the app directory to the Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+from benchmarks.fake_groq_server import FakeGroqServer
+
+# Settings are read when app modules are imported, so the environment has to
+# be in place before test modules are collected
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+os.environ.setdefault("LOG_LEVEL", "ERROR")  # Reduce log noise in tests
+
+_fake_groq = None
+
+def pytest_configure(config):
+    """Point the app at a local fake Groq server instead of the live API"""
+    global _fake_groq
+    _fake_groq = FakeGroqServer().start()
+    os.environ["GROQ_BASE_URL"] = _fake_groq.base_url
+
+def pytest_unconfigure(config):
+    if _fake_groq is not None:
+        _fake_groq.stop()
+
+@pytest.fixture
+def fake_groq_server():
+    """The running fake Groq server; fault settings are restored after each test
+
+    The fake answers a repeated prompt with the same questions, so duplicate
+    history is cleared to keep earlier tests from filtering them out.
+    """
+    from app.services.dedup_service import dedup_service
+    dedup_service.clear()
+    saved = dict(vars(_fake_groq.config))
+    yield _fake_groq
+    vars(_fake_groq.config).update(saved)
+
 @pytest.fixture
 def mock_groq_response():
     """Mock Groq API response"""
@@ -41,10 +73,3 @@ def sample_pdf_content():
     Supervised learning uses labeled data to train models that can make predictions
     on new, unseen data.
     """
-
-@pytest.fixture(autouse=True)
-def setup_test_env():
-    """Setup test environment"""
-    # Set test environment variables
-    os.environ.setdefault("GROQ_API_KEY", "test-key")
-    os.environ.setdefault("LOG_LEVEL", "ERROR")  # Reduce log noise in tests
\ No newline at end of file
@@ -0,0 +1,81 @@
+import pytest
+from app.services.cache_service import cache_service
+from app.services.groq_service import groq_service
+from app.services.mcq_service import mcq_service
+from app.services.warmer_service import CacheWarmer
+
+SAMPLE_RESULT = {
+    "questions": [
+        {
+            "question": "What is Python?",
+            "options": [
+                {"option": "A) A snake", "is_correct": False},
+                {"option": "B) A programming language", "is_correct": True},
+                {"option": "C) A framework", "is_correct": False},
+                {"option": "D) A database", "is_correct": False}
+            ],
+            "explanation": "Python is a high-level programming language."
+        }
+    ],
+    "usage": {"prompt_tokens": 400, "completion_tokens": 200, "total_tokens": 600}
+}
+
+@pytest.fixture
+def fake_groq(monkeypatch):
+    calls = []
+
+    async def generate_mcqs(prompt, background=False, **kwargs):
+        calls.append(background)
+        return dict(SAMPLE_RESULT)
+
+    monkeypatch.setattr(groq_service, "generate_mcqs", generate_mcqs)
+    cache_service.clear()
+    yield calls
+    cache_service.clear()
+
+class TestCacheWarmer:
+    def test_make_key_normalizes_topic(self):
+        first = cache_service.make_key("topic", "  Python   Basics ", 5, "easy", "general")
+        second = cache_service.make_key("topic", "python basics", 5, "easy", "general")
+        assert first == second
+
+    @pytest.mark.asyncio
+    async def test_repeated_topic_served_from_cache(self, fake_groq):
+        for _ in range(3):
+            await mcq_service.generate_mcqs_from_topic("Python", 1, "easy", "general")
+        assert fake_groq == [False]
+
+    @pytest.mark.asyncio
+    async def test_cache_bypass_regenerates_and_refreshes(self, fake_groq):
+        await mcq_service.generate_mcqs_from_topic("Python", 1, "easy", "general")
+        await mcq_service.generate_mcqs_from_topic("Python", 1, "easy", "general", use_cache=False)
+        await mcq_service.generate_mcqs_from_topic("Python", 1, "easy", "general")
+        assert fake_groq == [False, False]
+
+    @pytest.mark.asyncio
+    async def test_warmer_refreshes_popular_expiring_entries(self, fake_groq, monkeypatch):
+        for _ in range(3):
+            await mcq_service.generate_mcqs_from_topic("Python", 1, "easy", "general")
+        key = cache_service.make_key("topic", "Python", 1, "easy", "general")
+        cache_service.get_entry(key).expires_at = 0
+
+        warmer = CacheWarmer()
+        assert await warmer.run_once() == 1
+        assert fake_groq == [False, True]
+        assert warmer.tokens_used == 600
+
+    @pytest.mark.asyncio
+    async def test_warmer_respects_budget_and_live_traffic(self, fake_groq, monkeypatch):
+        for _ in range(3):
+            await mcq_service.generate_mcqs_from_topic("Python", 1, "easy", "general")
+        key = cache_service.make_key("topic", "Python", 1, "easy", "general")
+        cache_service.get_entry(key).expires_at = 0
+
+        warmer = CacheWarmer()
+        monkeypatch.setattr(groq_service, "live_in_flight", 1)
+        assert await warmer.run_once() == 0
+
+        monkeypatch.setattr(groq_service, "live_in_flight", 0)
+        warmer.tokens_used = 10 ** 9
+        assert await warmer.run_once() == 0
+        assert fake_groq == [False]
@@ -0,0 +1,121 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.config import settings
+from app.models.response_models import MCQOption, MCQuestion
+from app.services.cache_service import cache_service
+from app.services.dedup_service import DedupService, options_text, question_text
+
+client = TestClient(app)
+
+def make_question(question: str, options: list) -> MCQuestion:
+    return MCQuestion(
+        question=question,
+        options=[MCQOption(option=f"{letter}) {text}", is_correct=i == 0)
+                 for i, (letter, text) in enumerate(zip("ABCD", options))],
+        explanation="Because."
+    )
+
+CHLOROPHYLL = ["Absorbing light energy", "Storing glucose", "Transporting water", "Breaking down proteins"]
+MITOCHONDRIA = ["Producing ATP", "Synthesizing lipids", "Storing genetic code", "Digesting waste"]
+
+@pytest.fixture
+def questions():
+    return [
+        make_question("What is the main role of chlorophyll in plants?", CHLOROPHYLL),
+        make_question("Which organelle produces most of the cell's ATP?", MITOCHONDRIA),
+        make_question("What is the main role of the chlorophyll in plants?", list(reversed(CHLOROPHYLL))),
+    ]
+
+class TestDedup:
+    def test_text_ignores_case_option_order_and_labels(self):
+        shuffled = make_question("What is the MAIN role of chlorophyll in plants", list(reversed(CHLOROPHYLL)))
+        original = make_question("What is the main role of chlorophyll in plants?", CHLOROPHYLL)
+        assert question_text(shuffled) == question_text(original)
+        assert options_text(shuffled) == options_text(original)
+
+    def test_paraphrase_within_set_dropped(self, questions, monkeypatch):
+        monkeypatch.setattr(settings, "DEDUP_MODE", "drop")
+        kept, metadata = DedupService().apply("topic:biology", questions)
+        assert [q.question for q in kept] == [questions[0].question, questions[1].question]
+        assert metadata == {"duplicates_removed": 1}
+
+    def test_history_matches_flagged_not_dropped(self, questions, monkeypatch):
+        monkeypatch.setattr(settings, "DEDUP_MODE", "drop")
+        service = DedupService()
+        service.apply("topic:biology", questions[:2])
+        kept, metadata = service.apply("topic:biology", questions[2:])
+        assert kept == questions[2:]
+        assert metadata == {"previously_generated": [0]}
+        assert service.apply("topic:botany", questions[2:]) == (questions[2:], {})
+        assert service.apply("topic:biology", questions[:1], use_history=False) == (questions[:1], {})
+
+    def test_distinct_questions_kept(self):
+        service = DedupService()
+        distinct = [
+            make_question("What is the main role of chlorophyll in plants?", CHLOROPHYLL),
+            make_question("Which organelle produces most of the cell's ATP?", MITOCHONDRIA),
+            make_question("What does the main role of the nucleus involve?",
+                          ["Holding DNA", "Making starch", "Pumping ions", "Moving cilia"]),
+        ]
+        assert service.find_duplicates("topic:biology", distinct) == ([], [])
+
+    def test_distinct_questions_sharing_options_kept(self, monkeypatch):
+        monkeypatch.setattr(settings, "DEDUP_MODE", "drop")
+        options = ["Supervised learning", "Unsupervised learning", "Reinforcement learning", "Transfer learning"]
+        distinct = [
+            make_question("Which type of learning is used to train a spam filter on labelled emails?", options),
+            make_question("Which type of learning lets an agent improve by playing games against itself?", options),
+            make_question("Which type of learning groups customers without predefined labels?", options),
+        ]
+        assert DedupService().apply("topic:ml", distinct) == (distinct, {})
+
+    def test_flag_and_off_modes(self, questions, monkeypatch):
+        service = DedupService()
+        service.apply("topic:biology", questions[:1])
+        kept, metadata = service.apply("topic:biology", questions)
+        assert kept == questions
+        assert metadata == {"duplicate_questions": [2], "previously_generated": [0]}
+        monkeypatch.setattr(settings, "DEDUP_MODE", "off")
+        assert DedupService().apply("topic:biology", questions) == (questions, {})
+
+    def test_history_bounded_per_scope_and_globally(self, monkeypatch):
+        monkeypatch.setattr(settings, "DEDUP_HISTORY_SIZE", 4)
+        monkeypatch.setattr(settings, "DEDUP_MAX_SIGNATURES", 6)
+        service = DedupService()
+        for subject in ["gravity", "entropy", "inflation", "osmosis", "parliament", "torque"]:
+            service.find_duplicates("topic:mixed", [make_question(
+                f"Which statement about {subject} is correct?",
+                [f"{subject} {detail}" for detail in ("rises", "falls", "stays", "varies")]
+            )])
+        assert len(service._indexes["topic:mixed"]) == 4
+        service.find_duplicates("topic:other", [make_question(
+            f"Which statement about {subject} is correct?", [f"{subject} {i}" for i in "wxyz"]
+        ) for subject in ["voltage", "treaty", "enzyme"]])
+        assert list(service._indexes) == ["topic:other"]
+        assert len(service) == 3
+
+    def test_regenerated_topic_is_full_and_flagged(self, fake_groq_server):
+        cache_service.clear()
+        first = client.post("/api/v1/generate/topic", json={"topic": "Repeated topic", "num_questions": 5}).json()
+        assert first["total_questions"] == 5
+        assert "previously_generated" not in first["metadata"]
+        again = client.post(
+            "/api/v1/generate/topic", json={"topic": "Repeated topic", "num_questions": 5},
+            headers={"Cache-Control": "no-cache"}
+        ).json()
+        assert again["total_questions"] == 5
+        assert again["metadata"]["previously_generated"] == [0, 1, 2, 3, 4]
+
+    def test_shortened_set_stored_but_not_cached(self, fake_groq_server, monkeypatch):
+        cache_service.clear()
+        monkeypatch.setattr(settings, "DEDUP_MODE", "drop")
+        monkeypatch.setattr(settings, "DEDUP_THRESHOLD", 0.0)
+        monkeypatch.setattr(settings, "DEDUP_OPTIONS_THRESHOLD", 0.0)
+        response = client.post("/api/v1/generate/topic", json={"topic": "All alike", "num_questions": 3}).json()
+        assert response["total_questions"] == 1
+        assert response["metadata"]["duplicates_removed"] == 2
+        stored = client.get(f"/api/v1/results/{response['id']}").json()
+        assert stored["total_questions"] == 1
+        key = cache_service.make_key("topic", "All alike", 3, "medium", "general")
+        assert cache_service.get(key) is None
@@ -0,0 +1,60 @@
+import json
+import time
+import pytest
+from collections import deque
+from fastapi.testclient import TestClient
+from groq import AsyncGroq
+from app.main import app
+from app.config import settings
+from app.services.cache_service import cache_service
+from app.services.groq_service import groq_service
+from benchmarks.synthetic_pdf import make_pdf
+
+client = TestClient(app)
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    cache_service.clear()
+    yield
+    cache_service.clear()
+
+class TestFakeGroq:
+    def test_generate_from_pdf(self, fake_groq_server):
+        files = {"file": ("lecture.pdf", make_pdf(3), "application/pdf")}
+        response = client.post("/api/v1/generate/pdf", params={"num_questions": 3}, files=files)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_questions"] == 3
+        assert data["source_type"] == "pdf"
+
+    def test_malformed_json_is_reported(self, fake_groq_server):
+        fake_groq_server.config.malformed_rate = 1.0
+        response = client.post("/api/v1/generate/topic", json={"topic": "Malformed output"})
+        assert response.status_code == 500
+        assert response.json()["detail"] == "Failed to parse AI response"
+
+    def test_rate_limited_calls_fail_after_retries(self, fake_groq_server):
+        fake_groq_server.config.rate_limit_rate = 1.0
+        calls = fake_groq_server.calls
+        response = client.post("/api/v1/generate/topic", json={"topic": "Rate limited"})
+        assert response.status_code == 500
+        assert fake_groq_server.calls - calls > 1
+
+    @pytest.mark.asyncio
+    async def test_streaming_chat_completion(self, fake_groq_server):
+        groq = AsyncGroq(api_key="test-key", base_url=fake_groq_server.base_url)
+        stream = await groq.chat.completions.create(
+            messages=[{"role": "user", "content": "Create 2 high-quality questions"}],
+            model=settings.GROQ_MODEL,
+            stream=True
+        )
+        content = ""
+        async for chunk in stream:
+            content += chunk.choices[0].delta.content or ""
+        assert len(json.loads(content)["questions"]) == 2
+
+    @pytest.mark.asyncio
+    async def test_recent_calls_pruned_on_each_call(self, fake_groq_server, monkeypatch):
+        monkeypatch.setattr(groq_service, "_recent_calls", deque([time.monotonic() - 120] * 100))
+        await groq_service.generate_mcqs("Create 1 high-quality questions")
+        assert len(groq_service._recent_calls) == 1
@@ -0,0 +1,109 @@
+import json
+import logging
+import queue
+from fastapi.testclient import TestClient
+from app.main import app
+from app.config import settings
+from app.models.response_models import MCQResponse
+from app.utils.logging_config import DroppingQueueHandler, JsonFormatter, RequestContextFilter, log_payload, setup_logging
+from app.utils.request_context import request_id_var, stage_timings_var, track_stage
+
+client = TestClient(app)
+
+class CaptureHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+class TestLogging:
+    def test_json_formatter_includes_request_id_and_extras(self):
+        record = logging.LogRecord("app.test", logging.INFO, __file__, 1, "hello %s", ("world",), None)
+        record.stages = {"groq_call": 12.5}
+        token = request_id_var.set("abc123")
+        try:
+            RequestContextFilter().filter(record)
+        finally:
+            request_id_var.reset(token)
+
+        data = json.loads(JsonFormatter().format(record))
+        assert data["message"] == "hello world"
+        assert data["request_id"] == "abc123"
+        assert data["stages"] == {"groq_call": 12.5}
+
+    def test_queued_exception_stays_structured(self):
+        log_queue = queue.Queue()
+        logger = logging.getLogger("app.test.queue")
+        handler = DroppingQueueHandler(log_queue)
+        logger.addHandler(handler)
+        try:
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                logger.exception("failed for %s", "abc")
+        finally:
+            logger.removeHandler(handler)
+
+        data = json.loads(JsonFormatter().format(log_queue.get_nowait()))
+        assert data["message"] == "failed for abc"
+        assert "ValueError: boom" in data["exc_info"]
+
+    def test_queued_mutable_args_are_snapshotted(self):
+        log_queue = queue.Queue()
+        logger = logging.getLogger("app.test.queue")
+        handler = DroppingQueueHandler(log_queue)
+        logger.addHandler(handler)
+        stages = ["parse"]
+        try:
+            logger.error("stages %s for %s", stages, "abc")
+            logger.error("count %d", 3)
+        finally:
+            logger.removeHandler(handler)
+        stages.append("dedup")
+
+        snapshot, deferred = log_queue.get_nowait(), log_queue.get_nowait()
+        assert snapshot.getMessage() == "stages ['parse'] for abc"
+        assert deferred.args == (3,)
+
+    def test_uvicorn_loggers_routed_through_queue(self):
+        access = logging.getLogger("uvicorn.access")
+        access.addHandler(logging.StreamHandler())
+        access.propagate = False
+        setup_logging()
+        assert access.handlers == [] and access.propagate
+        assert not access.isEnabledFor(logging.INFO)
+        assert logging.getLogger("uvicorn.error").handlers == []
+
+    def test_track_stage_records_timing(self):
+        token = stage_timings_var.set({})
+        try:
+            with track_stage("parse"):
+                pass
+            assert "parse" in stage_timings_var.get()
+        finally:
+            stage_timings_var.reset(token)
+
+    def test_payload_logging_respects_sample_rate(self, monkeypatch):
+        logger = logging.getLogger("app.test.payload")
+        handler = CaptureHandler()
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        response = MCQResponse(questions=[], generated_at="now", source_type="topic", total_questions=0)
+        try:
+            monkeypatch.setattr(settings, "LOG_PAYLOAD_SAMPLE_RATE", 0.0)
+            log_payload(logger, "payload", response)
+            assert handler.records == []
+
+            monkeypatch.setattr(settings, "LOG_PAYLOAD_SAMPLE_RATE", 1.0)
+            log_payload(logger, "payload", response)
+            assert handler.records[0].payload["source_type"] == "topic"
+        finally:
+            logger.removeHandler(handler)
+            logger.setLevel(logging.NOTSET)
+
+    def test_request_id_header(self):
+        response = client.get("/live", headers={"X-Request-ID": "req-42"})
+        assert response.headers["X-Request-ID"] == "req-42"
+        assert client.get("/live").headers["X-Request-ID"]
@@ -0,0 +1,53 @@
+import pytest
+import tracemalloc
+from fastapi.testclient import TestClient
+from app.main import app
+from app.config import settings
+
+client = TestClient(app)
+
+ADMIN = {"X-Admin-Token": "secret"}
+
+@pytest.fixture
+def profiling(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+
+class TestProfiling:
+    def test_admin_endpoints_hidden_when_disabled(self):
+        response = client.get("/admin/slow-requests", headers=ADMIN)
+        assert response.status_code == 404
+
+    def test_admin_endpoints_require_token(self, profiling):
+        response = client.get("/admin/slow-requests", headers={"X-Admin-Token": "wrong"})
+        assert response.status_code == 403
+
+    def test_profile_only_with_admin_token(self, profiling):
+        response = client.get("/live?profile=1")
+        assert "X-Profile-ID" not in response.headers
+
+        response = client.get("/live?profile=1", headers=ADMIN)
+        profile_id = response.headers["X-Profile-ID"]
+
+        report = client.get(f"/admin/profiles/{profile_id}", headers=ADMIN).json()
+        assert report["request_id"] == profile_id
+        assert "stacks" in report["cpu"]
+        assert "top_allocations" in report["memory"]
+
+    def test_external_tracing_left_running(self, profiling):
+        tracemalloc.start()
+        try:
+            response = client.get("/live?profile=1", headers=ADMIN)
+            assert tracemalloc.is_tracing()
+        finally:
+            tracemalloc.stop()
+        report = client.get(f"/admin/profiles/{response.headers['X-Profile-ID']}", headers=ADMIN).json()
+        assert "peak_above_start_bytes" in report["memory"]
+        client.get("/live?profile=1", headers=ADMIN)
+        assert not tracemalloc.is_tracing()
+
+    def test_slow_requests_report(self, profiling):
+        client.get("/ready")
+        data = client.get("/admin/slow-requests?limit=5", headers=ADMIN).json()
+        assert data["requests"]
+        assert {"duration_ms", "stages", "path"} <= set(data["requests"][0])
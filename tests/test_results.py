@@ -0,0 +1,56 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.cache_service import cache_service
+from app.services.result_store import result_store
+from app.utils.http_cache import etag_matches, negotiate_encoding
+
+client = TestClient(app)
+
+@pytest.fixture
+def generated(fake_groq_server):
+    cache_service.clear()
+    response = client.post("/api/v1/generate/topic", json={"topic": "HTTP caching", "num_questions": 10})
+    assert response.status_code == 200
+    return response
+
+class TestResults:
+    def test_negotiate_encoding(self):
+        assert negotiate_encoding("gzip, br", 10) == "identity"
+        assert negotiate_encoding("gzip", 10 ** 6) == "gzip"
+        assert negotiate_encoding("gzip;q=0.5, br", 10 ** 6) == "br"
+        assert negotiate_encoding("br;q=0, gzip;q=0", 10 ** 6) == "identity"
+        assert negotiate_encoding(None, 10 ** 6) == "identity"
+
+    def test_etag_matches(self):
+        assert etag_matches('"abc"', '"abc"')
+        assert etag_matches('W/"abc", "def"', '"abc"')
+        assert etag_matches("*", '"abc"')
+        assert not etag_matches('"def"', '"abc"')
+
+    def test_generated_result_is_retrievable(self, generated):
+        data = generated.json()
+        assert data["id"]
+        response = client.get(f"/api/v1/results/{data['id']}")
+        assert response.status_code == 200
+        assert response.json() == data
+        assert response.headers["ETag"] == generated.headers["ETag"]
+
+    def test_conditional_get_returns_304(self, generated):
+        result_id = generated.json()["id"]
+        response = client.get(f"/api/v1/results/{result_id}", headers={"If-None-Match": generated.headers["ETag"]})
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_compressed_bytes_are_reused(self, generated):
+        stored = result_store.get(generated.json()["id"])
+        response = client.get(f"/api/v1/results/{stored.id}", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert stored.encoded("gzip") is stored.encoded("gzip")
+
+    def test_cached_generation_keeps_id(self, generated):
+        again = client.post("/api/v1/generate/topic", json={"topic": "HTTP caching", "num_questions": 10})
+        assert again.json()["id"] == generated.json()["id"]
+
+    def test_unknown_result(self):
+        assert client.get("/api/v1/results/missing").status_code == 404
@@ -0,0 +1,136 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.config import settings
+from app.services.cache_service import cache_service
+from app.services.scheduler_service import TenantScheduler, tenant_scheduler
+from app.utils.exceptions import CompletionTruncatedError, QuotaExceededError
+
+client = TestClient(app)
+
+@pytest.fixture
+def tenants(monkeypatch):
+    monkeypatch.setattr(settings, "TENANT_API_KEYS", {"key-a": "school-a", "key-b": "school-b"})
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    tenant_scheduler.reset()
+    cache_service.clear()
+    yield
+    tenant_scheduler.reset()
+
+class TestScheduler:
+    def test_resolve_tenant(self, tenants, monkeypatch):
+        assert TenantScheduler.resolve_tenant("key-a") == "school-a"
+        assert TenantScheduler.resolve_tenant("unknown") is None
+        assert TenantScheduler.resolve_tenant(None) == "anonymous"
+        monkeypatch.setattr(settings, "TENANT_REQUIRE_API_KEY", True)
+        assert TenantScheduler.resolve_tenant(None) is None
+
+    def test_resolve_priority_limits(self, monkeypatch):
+        monkeypatch.setattr(settings, "TENANT_PRIORITIES", {
+            "importer": {"default": "batch", "max": "batch"},
+            "lms": {"default": "batch"}
+        })
+        assert TenantScheduler.resolve_priority("importer", None) == "batch"
+        assert TenantScheduler.resolve_priority("importer", "interactive") == "batch"
+        assert TenantScheduler.resolve_priority("lms", None) == "batch"
+        assert TenantScheduler.resolve_priority("lms", "interactive") == "interactive"
+        assert TenantScheduler.resolve_priority("other", None) == "interactive"
+        monkeypatch.setattr(settings, "TENANT_DEFAULT_PRIORITY", "batch")
+        assert TenantScheduler.resolve_priority("other", "bogus") == "batch"
+
+    @pytest.mark.asyncio
+    async def test_request_quota_with_burst(self, monkeypatch):
+        monkeypatch.setattr(settings, "TENANT_QUOTAS", {"school-a": {"requests_per_minute": 1, "request_burst": 2}})
+        scheduler = TenantScheduler()
+
+        async def call():
+            return {"usage": {"total_tokens": 10}}
+
+        await scheduler.run("school-a", "interactive", 10, call)
+        await scheduler.run("school-a", "interactive", 10, call)
+        with pytest.raises(QuotaExceededError) as exc:
+            await scheduler.run("school-a", "interactive", 10, call)
+        assert exc.value.retry_after > 0
+        await scheduler.run("school-b", "interactive", 10, call)
+        assert scheduler.usage["school-a"].rejected == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_call_usage_is_billed(self, monkeypatch):
+        monkeypatch.setattr(settings, "TENANT_QUOTAS", {"school-a": {"tokens_per_minute": 60, "token_burst": 1000}})
+        scheduler = TenantScheduler()
+
+        async def truncated():
+            raise CompletionTruncatedError("cut off", max_tokens=100, usage={
+                "prompt_tokens": 50, "completion_tokens": 100, "total_tokens": 150
+            })
+
+        with pytest.raises(CompletionTruncatedError):
+            await scheduler.run("school-a", "interactive", 100, truncated)
+        usage = scheduler.usage["school-a"]
+        assert (usage.errors, usage.completion_tokens, usage.total_tokens) == (1, 100, 150)
+        assert scheduler._tenant_buckets("school-a")["tokens"].available() < 1000 - 149
+
+    @pytest.mark.asyncio
+    async def test_weighted_fair_order_and_priority(self, monkeypatch):
+        monkeypatch.setattr(settings, "SCHEDULER_MAX_CONCURRENCY", 1)
+        scheduler = TenantScheduler()
+        gate = asyncio.Event()
+        order = []
+
+        def call(name):
+            async def run():
+                if name == "blocker":
+                    await gate.wait()
+                order.append(name)
+                return {}
+            return run
+
+        tasks = [asyncio.create_task(scheduler.run("school-a", "interactive", 100, call("blocker")))]
+        await asyncio.sleep(0)
+        for name, tenant, priority in [
+            ("a1", "school-a", "interactive"),
+            ("a2", "school-a", "interactive"),
+            ("bulk", "school-c", "batch"),
+            ("b1", "school-b", "interactive"),
+        ]:
+            tasks.append(asyncio.create_task(scheduler.run(tenant, priority, 100, call(name))))
+            await asyncio.sleep(0)
+        gate.set()
+        await asyncio.gather(*tasks)
+        assert order == ["blocker", "a1", "b1", "a2", "bulk"]
+
+    def test_quota_exceeded_returns_429(self, tenants, fake_groq_server, monkeypatch):
+        monkeypatch.setattr(settings, "TENANT_QUOTAS", {"school-a": {"requests_per_minute": 1, "request_burst": 1}})
+        headers = {"X-API-Key": "key-a"}
+        assert client.post("/api/v1/generate/topic", json={"topic": "Quota one"}, headers=headers).status_code == 200
+        response = client.post("/api/v1/generate/topic", json={"topic": "Quota two"}, headers=headers)
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+
+    def test_unknown_api_key_rejected(self, tenants):
+        response = client.post("/api/v1/generate/topic", json={"topic": "Who am I"}, headers={"X-API-Key": "nope"})
+        assert response.status_code == 401
+
+    def test_usage_report(self, tenants, fake_groq_server):
+        client.post("/api/v1/generate/topic", json={"topic": "Billing"}, headers={"X-API-Key": "key-b"})
+        response = client.get("/admin/tenants", headers={"X-Admin-Token": "secret"})
+        usage = response.json()["tenants"]["school-b"]
+        assert usage["requests"] == 1
+        assert usage["total_tokens"] > 0
+
+    def test_results_scoped_to_tenant(self, tenants, fake_groq_server, monkeypatch):
+        monkeypatch.setattr(settings, "TENANT_REQUIRE_API_KEY", True)
+        result_id = client.post(
+            "/api/v1/generate/topic", json={"topic": "Private quiz"}, headers={"X-API-Key": "key-a"}
+        ).json()["id"]
+        assert client.get(f"/api/v1/results/{result_id}").status_code == 401
+        assert client.get(f"/api/v1/results/{result_id}", headers={"X-API-Key": "key-b"}).status_code == 404
+        assert client.get(f"/api/v1/results/{result_id}", headers={"X-API-Key": "key-a"}).status_code == 200
+
+    def test_cache_hits_counted_per_tenant(self, tenants, fake_groq_server):
+        for key in ("key-a", "key-b", "key-b"):
+            client.post("/api/v1/generate/topic", json={"topic": "Shared topic"}, headers={"X-API-Key": key})
+        usage = tenant_scheduler.usage_report()
+        assert (usage["school-a"]["requests"], usage["school-a"]["cache_hits"]) == (1, 0)
+        assert (usage["school-b"]["requests"], usage["school-b"]["cache_hits"]) == (0, 2)
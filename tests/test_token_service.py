@@ -0,0 +1,73 @@
+from fastapi.testclient import TestClient
+from app.main import app
+from app.config import settings
+from app.services.cache_service import cache_service
+from app.services.groq_service import SYSTEM_PROMPT
+from app.services.mcq_service import mcq_service
+from app.services.token_service import TokenEstimator, token_estimator
+
+client = TestClient(app)
+
+class TestTokenService:
+    def test_truncate_fits_budget(self):
+        estimator = TokenEstimator()
+        text = "Machine learning models generalize from examples. " * 500
+        truncated = estimator.truncate(text, 100)
+        assert estimator.count(truncated) <= 100
+        assert text.startswith(truncated)
+        assert estimator.truncate("short text", 100) == "short text"
+
+    def test_max_tokens_scales_with_questions(self):
+        estimator = TokenEstimator()
+        assert estimator.max_tokens_for(1) < estimator.max_tokens_for(10)
+        assert estimator.max_tokens_for(10 ** 6) == settings.MAX_TOKENS
+
+    def test_observe_calibrates_towards_usage(self):
+        estimator = TokenEstimator()
+        prompt = "Create 5 questions about photosynthesis. " * 20
+        raw = estimator.raw_count(SYSTEM_PROMPT) + estimator.raw_count(prompt)
+        for _ in range(100):
+            estimator.observe((SYSTEM_PROMPT, prompt), raw * 2 + 14, 5, 5 * 120 + 20)
+        assert abs(estimator.scale - 2.0) < 0.01
+        assert abs(estimator.tokens_per_question - 120) < 1
+
+    def test_variance_and_truncation_widen_budget(self):
+        estimator = TokenEstimator()
+        steady = estimator.max_tokens_for(10)
+        for per_question in [100, 300] * 20:
+            estimator.observe((), 0, 1, per_question + 20)
+        assert abs(estimator.tokens_per_question - 200) < 20
+        assert estimator.max_tokens_for(10) > steady
+        widened = estimator.max_tokens_for(10)
+        estimator.observe_truncated(10, widened)
+        assert estimator.max_tokens_for(10) > widened
+        assert estimator.truncations == 1
+
+    def test_truncated_completion_retried_with_max_tokens(self, fake_groq_server, monkeypatch):
+        cache_service.clear()
+        monkeypatch.setattr(token_estimator, "tokens_per_question", 5.0)
+        monkeypatch.setattr(token_estimator, "tokens_per_question_var", 0.0)
+        monkeypatch.setattr(token_estimator, "truncations", 0)
+        calls = fake_groq_server.calls
+        response = client.post("/api/v1/generate/topic", json={"topic": "Long answers", "num_questions": 5})
+        assert response.status_code == 200
+        assert response.json()["total_questions"] == 5
+        assert response.json()["metadata"]["max_tokens"] == settings.MAX_TOKENS
+        assert fake_groq_server.calls - calls >= 2
+        assert token_estimator.truncations == 1
+        assert token_estimator.tokens_per_question > 5.0
+
+    def test_pdf_prompt_fits_token_budget(self):
+        content = "Supervised learning uses labeled data to train models. " * 2000
+        prompt = mcq_service.create_mcq_prompt(content, 5, "medium", "general", is_pdf=True)
+        assert token_estimator.count_messages(SYSTEM_PROMPT, prompt) <= settings.PROMPT_MAX_TOKENS
+        assert "Supervised learning" in prompt
+
+    def test_metadata_reports_token_usage(self, fake_groq_server):
+        cache_service.clear()
+        response = client.post("/api/v1/generate/topic", json={"topic": "Token accounting", "num_questions": 2})
+        assert response.status_code == 200
+        metadata = response.json()["metadata"]
+        assert metadata["prompt_tokens"] > 0
+        assert metadata["completion_tokens"] > 0
+        assert 0 < metadata["max_tokens"] <= settings.MAX_TOKENS